@@ -2,20 +2,92 @@
 Batching support.
 
 """
+from threading import Lock
 
 
-def batched(resources, batch_size, **kwargs):
+class Batch(list):
+    """
+    A batch of resources, along with their serialized data (if it was computed while batching).
+
+    """
+    def __init__(self, resources=(), data=None):
+        super().__init__(resources)
+        self.data = data
+
+
+def batched(resources, batch_size, max_batch_bytes=None, formatter=None, batch_sizer=None, **kwargs):
     """
     Chunk resources into batches with a common type.
 
+    Batches are limited to `batch_size` resources (or the current size of an adaptive `batch_sizer`)
+    and, if `max_batch_bytes` is given, to that many bytes of serialized resources. The serialized
+    resources are kept with their batch so that they need not be serialized again.
+
+    """
+    batch, batch_bytes = Batch(data=[] if max_batch_bytes else None), 0
+    for resource in resources:
+        if max_batch_bytes:
+            data = formatter.value.serialize(resource)
+            size = len(data.encode("utf-8"))
+        else:
+            size = 0
+
+        if batch:
+            different_type = resource.type != batch[0].type
+            too_many = len(batch) >= (batch_sizer.batch_size if batch_sizer else batch_size)
+            too_large = max_batch_bytes and batch_bytes + size > max_batch_bytes
+
+            if different_type or too_many or too_large:
+                yield batch
+                batch, batch_bytes = Batch(data=[] if max_batch_bytes else None), 0
+
+        batch.append(resource)
+        batch_bytes += size
+        if max_batch_bytes:
+            batch.data.append(data)
+
+    yield batch
+
+
+class AdaptiveBatchSize:
+    """
+    Adapt the batch size to the observed latency of batch writes.
+
+    Uses additive increase, multiplicative decrease: the batch size grows while full batches are
+    written within the target latency and halves when they are slower or are rejected by the server
+    (e.g. with a 413 or 504), so throughput converges without manual tuning.
+
+    Safe to share between concurrent writers.
+
     """
-    previous = 0
-    for index, resource in enumerate(resources):
-        different_type = resource.type != resources[previous].type
-        too_many = index - previous >= batch_size
+    def __init__(self, batch_size, target_latency, max_batch_size=1000):
+        self.batch_size = batch_size
+        self.target_latency = target_latency
+        self.max_batch_size = max(batch_size, max_batch_size)
+        self.lock = Lock()
+
+    def __repr__(self):
+        return "{}({})".format(
+            self.__class__.__name__,
+            self.batch_size,
+        )
+
+    def record_success(self, count, elapsed):
+        """
+        Record a successful write of `count` resources that took `elapsed` seconds.
+
+        """
+        with self.lock:
+            if elapsed > self.target_latency:
+                self.batch_size = max(1, self.batch_size // 2)
+            elif count >= self.batch_size:
+                # only grow once batches are actually limited by the batch size
+                self.batch_size = min(self.max_batch_size, self.batch_size + max(1, self.batch_size // 4))
 
-        if different_type or too_many:
-            yield resources[previous:index]
-            previous = index
+    def record_failure(self, count):
+        """
+        Record that a write of `count` resources was rejected as too large or too slow.
 
-    yield resources[previous:]
+        """
+        with self.lock:
+            self.batch_size = max(1, min(self.batch_size, count) // 2)
@@ -0,0 +1,160 @@
+"""
+HTTP response caching.
+
+"""
+from hashlib import sha256
+from json import dump, dumps, load
+from os import (
+    getpid,
+    makedirs,
+    replace,
+    scandir,
+    stat,
+    unlink,
+    utime,
+)
+from os.path import join
+from threading import Lock, get_ident
+
+
+# evict down to this fraction of the maximum size, so that eviction is not repeated on every put
+LOW_WATER_MARK = 0.9
+
+
+class ResponseCache:
+    """
+    An on-disk cache of parsed HTTP responses.
+
+    Cached responses are revalidated using conditional requests (`If-None-Match` and
+    `If-Modified-Since`); on a `304 Not Modified` the cached, parsed payload is reused instead of
+    downloading and parsing the response again.
+
+    Entries are evicted least recently used first once the cache exceeds `max_size` bytes, until
+    it is back below its low water mark.
+
+    """
+    def __init__(self, path, max_size):
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+        makedirs(path, exist_ok=True)
+        self.size = sum(entry.stat().st_size for entry in self.iter_entries())
+
+    def __repr__(self):
+        return "{}('{}')".format(
+            self.__class__.__name__,
+            self.path,
+        )
+
+    def key(self, uri, auth=None, limit=None):
+        """
+        Compute the cache key for a request.
+
+        The key includes the auth identity (without storing credentials) because different users
+        may see different content.
+
+        """
+        username, password = auth or (None, None)
+        return sha256(dumps([
+            uri,
+            username,
+            sha256(password.encode("utf-8")).hexdigest() if password else None,
+            limit,
+        ]).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Return the cached entry for a key (or `None`).
+
+        """
+        path = self.path_for(key)
+        try:
+            with open(path) as file_:
+                entry = load(file_)
+            # mark the entry as recently used
+            utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def conditional_headers(self, entry):
+        """
+        Compute the headers needed to revalidate an entry.
+
+        """
+        headers = dict()
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, key, headers, data):
+        """
+        Cache the parsed data for a response, if the response can be revalidated.
+
+        """
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        path = self.path_for(key)
+        temp_path = "{}.{}.{}.tmp".format(path, getpid(), get_ident())
+        try:
+            with open(temp_path, "w") as file_:
+                dump(dict(etag=etag, last_modified=last_modified, data=data), file_)
+                size = file_.tell()
+        except (TypeError, ValueError):
+            # not all (e.g. YAML) payloads can be cached
+            unlink(temp_path)
+            return
+
+        with self.lock:
+            try:
+                self.size -= stat(path).st_size
+            except OSError:
+                pass
+            replace(temp_path, path)
+            self.size += size
+
+            if self.size > self.max_size:
+                self.evict()
+
+    def record_hit(self):
+        with self.lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self.lock:
+            self.misses += 1
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache is below its low water mark.
+
+        """
+        target_size = int(self.max_size * LOW_WATER_MARK)
+        entries = sorted(
+            (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+            for entry in self.iter_entries()
+        )
+        for _, size, path in entries:
+            if self.size <= target_size:
+                break
+            try:
+                unlink(path)
+            except OSError:
+                continue
+            self.size -= size
+
+    def iter_entries(self):
+        for entry in scandir(self.path):
+            if entry.name.endswith(".json"):
+                yield entry
+
+    def path_for(self, key):
+        return join(self.path, "{}.json".format(key))
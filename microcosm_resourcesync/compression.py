@@ -0,0 +1,213 @@
+"""
+Compression support.
+
+Compressed files are detected by extension (when writing) or by magic bytes (when reading) and are
+(de)compressed as streams. Large files may be (de)compressed by multi-threaded external tools
+(`pigz`, `pbzip2`, and `xz`), when installed.
+
+"""
+import bz2
+import gzip
+import lzma
+from contextlib import contextmanager
+from enum import Enum, unique
+from io import TextIOWrapper
+from os.path import splitext
+from shutil import which
+from subprocess import PIPE, Popen
+
+
+@unique
+class Compression(Enum):
+    """
+    Supported compression formats.
+
+    """
+    GZIP = u"GZIP"
+    BZIP2 = u"BZIP2"
+    XZ = u"XZ"
+
+    @property
+    def extension(self):
+        return EXTENSIONS[self]
+
+    @property
+    def magic(self):
+        return MAGIC[self]
+
+    @property
+    def module(self):
+        return MODULES[self]
+
+    def compress(self, data):
+        return self.module.compress(data)
+
+    def decompress(self, data):
+        return self.module.decompress(data)
+
+    def open_stream(self, fileobj, mode):
+        """
+        Wrap a binary stream with a (single-threaded) compressor or decompressor.
+
+        """
+        if self == Compression.GZIP:
+            return gzip.GzipFile(fileobj=fileobj, mode=mode)
+        if self == Compression.BZIP2:
+            return bz2.BZ2File(fileobj, mode=mode)
+        return lzma.LZMAFile(fileobj, mode=mode)
+
+    def command(self, threads, decompress=False):
+        """
+        Return the command line for a multi-threaded external (de)compressor, if one is installed.
+
+        """
+        executable = EXECUTABLES[self]
+        if threads <= 1 or which(executable) is None:
+            return None
+
+        command = [executable, "-c"]
+        if decompress:
+            command.append("-d")
+        if self == Compression.BZIP2:
+            command.append("-p{}".format(threads))
+        elif self == Compression.GZIP:
+            command.extend(["-p", str(threads)])
+        else:
+            command.extend(["-T", str(threads)])
+        return command
+
+    @classmethod
+    def for_extension(cls, ext):
+        for compression in cls:
+            if ext == compression.extension:
+                return compression
+        return None
+
+    @classmethod
+    def for_data(cls, data):
+        for compression in cls:
+            if data.startswith(compression.magic):
+                return compression
+        return None
+
+
+EXTENSIONS = {
+    Compression.GZIP: ".gz",
+    Compression.BZIP2: ".bz2",
+    Compression.XZ: ".xz",
+}
+
+MAGIC = {
+    Compression.GZIP: b"\x1f\x8b",
+    Compression.BZIP2: b"BZh",
+    Compression.XZ: b"\xfd7zXZ\x00",
+}
+
+MODULES = {
+    Compression.GZIP: gzip,
+    Compression.BZIP2: bz2,
+    Compression.XZ: lzma,
+}
+
+EXECUTABLES = {
+    Compression.GZIP: "pigz",
+    Compression.BZIP2: "pbzip2",
+    Compression.XZ: "xz",
+}
+
+# enough bytes to detect any supported format
+MAGIC_SIZE = max(len(magic) for magic in MAGIC.values())
+
+
+def split_compression(path):
+    """
+    Split a path into its uncompressed path and its compression (if any), by extension.
+
+    """
+    base, ext = splitext(path)
+    compression = Compression.for_extension(ext)
+    if compression is None:
+        return path, None
+    return base, compression
+
+
+def detect_compression(path):
+    """
+    Detect the compression of a file by its magic bytes.
+
+    """
+    with open(path, "rb") as file_:
+        return Compression.for_data(file_.read(MAGIC_SIZE))
+
+
+def decompress(data):
+    """
+    Decompress data (in memory) if it starts with known magic bytes.
+
+    """
+    compression = Compression.for_data(data)
+    if compression is None:
+        return data
+    return compression.decompress(data)
+
+
+@contextmanager
+def compressed_stream(fileobj, mode, compression, threads=1):
+    """
+    Wrap a binary stream for streaming (de)compression, yielding a text stream.
+
+    With more than one thread, an installed external tool does the (de)compression in a subprocess.
+
+    """
+    reading = mode == "r"
+    command = compression.command(threads, decompress=reading) if compression else None
+
+    if command is None:
+        stream = compression.open_stream(fileobj, mode) if compression else fileobj
+        text = TextIOWrapper(stream, encoding="utf-8")
+        try:
+            yield text
+        finally:
+            # NB: closing the wrapper would also close the underlying stream
+            text.flush()
+            text.detach()
+            if compression:
+                stream.close()
+        return
+
+    fileobj.flush()
+    if reading:
+        process = Popen(command, stdin=fileobj, stdout=PIPE)
+        text = TextIOWrapper(process.stdout, encoding="utf-8")
+    else:
+        process = Popen(command, stdin=PIPE, stdout=fileobj)
+        text = TextIOWrapper(process.stdin, encoding="utf-8")
+
+    completed = False
+    try:
+        yield text
+        completed = True
+    finally:
+        text.close()
+        # a reader that stops early may cause the subprocess to fail; only report real failures
+        if process.wait() != 0 and completed:
+            raise Exception("Failed {}: {}".format(
+                "decompressing" if reading else "compressing",
+                " ".join(command),
+            ))
+
+
+@contextmanager
+def open_compressed(path, mode, compression=None, threads=1):
+    """
+    Open a (possibly compressed) file as a text stream for reading ("r") or writing ("w" or "a").
+
+    When reading, the compression is detected by magic bytes.
+
+    """
+    if mode == "r":
+        compression = detect_compression(path)
+
+    with open(path, mode + "b") as file_:
+        with compressed_stream(file_, mode, compression, threads) as stream:
+            yield stream
@@ -4,10 +4,14 @@ Endpoint types.
 """
 from os.path import abspath, exists, split
 
+from microcosm_resourcesync.compression import split_compression
+from microcosm_resourcesync.endpoints.archive_endpoint import ArchiveEndpoint, is_archive
 from microcosm_resourcesync.endpoints.directory_endpoint import DirectoryEndpoint
 from microcosm_resourcesync.endpoints.http_endpoint import HTTPEndpoint
+from microcosm_resourcesync.endpoints.jsonl_file_endpoint import JSONLinesFileEndpoint
 from microcosm_resourcesync.endpoints.null_endpoint import NullEndpoint
 from microcosm_resourcesync.endpoints.pipe_endpoint import PipeEndpoint
+from microcosm_resourcesync.endpoints.sqlite_endpoint import SQLITE_PREFIX, SQLiteEndpoint
 from microcosm_resourcesync.endpoints.yaml_file_endpoint import YAMLFileEndpoint
 
 
@@ -25,9 +29,21 @@ def endpoint_for(endpoint):
     if endpoint.startswith("http://") or endpoint.startswith("https://"):
         return HTTPEndpoint(endpoint)
 
-    if endpoint.endswith(".yaml") or endpoint.endswith(".yml"):
+    if endpoint.startswith(SQLITE_PREFIX):
+        return SQLiteEndpoint(endpoint[len(SQLITE_PREFIX):])
+
+    if is_archive(endpoint):
+        return ArchiveEndpoint(endpoint)
+
+    # files may be compressed
+    path, _ = split_compression(endpoint)
+
+    if path.endswith(".yaml") or path.endswith(".yml"):
         return YAMLFileEndpoint(endpoint)
 
+    if path.endswith(".jsonl") or path.endswith(".ndjson"):
+        return JSONLinesFileEndpoint(endpoint)
+
     if exists(split(abspath(endpoint))[0]):
         return DirectoryEndpoint(endpoint)
 
@@ -37,6 +37,15 @@ class Endpoint(metaclass=ABCMeta):
         """
         pass
 
+    def content_hashes(self, schema_cls, **kwargs):
+        """
+        Compute the content hashes of the resources currently stored by this endpoint.
+
+        Returns `None` if this is not possible.
+
+        """
+        return None
+
     def validate_for_read(self, schema_cls, **kwargs):
         """
         Validate that reading is possible.
@@ -2,19 +2,208 @@
 Read/write from a directory tree.
 
 """
-from os import walk
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from hashlib import sha256
+from itertools import chain
+from json import dump, load
+from os import (
+    getpid,
+    replace,
+    scandir,
+    stat,
+)
 from os.path import (
     exists,
     isdir,
     join,
+    relpath,
+    split,
     splitext,
 )
 from shutil import rmtree
+from timeit import default_timer
 
-from click import ClickException
+from click import ClickException, echo
 
+from microcosm_resourcesync.compression import Compression, decompress, split_compression
 from microcosm_resourcesync.endpoints.base import Endpoint
 from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.incremental import content_hash
+from microcosm_resourcesync.indexing import IndexEntry, ResourceIndex, identity_of
+from microcosm_resourcesync.parallel import chunked, imap_bounded
+from microcosm_resourcesync.schemas import LazyResource, as_dict
+from microcosm_resourcesync.schemas.base import Raw
+
+
+# the name of the (hidden) index file
+INDEX_NAME = ".index.json"
+
+# the name of the (hidden) layout marker file
+LAYOUT_NAME = ".layout.json"
+
+
+# the number of files parsed (or written) by a worker at a time
+READ_CHUNK_SIZE = 256
+WRITE_CHUNK_SIZE = 256
+
+
+def formatter_for(name):
+    """
+    Return the formatter for a (possibly compressed) file name's extension.
+
+    """
+    base, _ = split_compression(name)
+    _, ext = splitext(base)
+    return Formatters.for_extension(ext).value
+
+
+def load_data(name, data):
+    """
+    Load a single (possibly compressed) resource, using the formatter for its (file) name's extension.
+
+    """
+    return formatter_for(name).load(decompress(data).decode("utf-8"))
+
+
+def load_file(path):
+    with open(path, "rb") as file_:
+        return load_data(path, file_.read())
+
+
+def load_raw_file(path):
+    """
+    Load the (decompressed) data of a resource file, without parsing it.
+
+    """
+    with open(path, "rb") as file_:
+        return Raw(formatter_for(path).extension, decompress(file_.read()).decode("utf-8"))
+
+
+def load_resource_file(path, raw_extension=None):
+    """
+    Load a resource file, along with its raw data if it is in the format with the `raw_extension`.
+
+    """
+    formatter = formatter_for(path)
+    if formatter.extension != raw_extension:
+        return load_file(path), None
+
+    raw = load_raw_file(path)
+    return formatter.load(raw.data), raw
+
+
+def load_files(paths, raw_extension=None):
+    return [
+        load_resource_file(path, raw_extension)
+        for path in paths
+    ]
+
+
+def write_file(path, location, resource, identity, data, formatter, compression=None):
+    """
+    Write a single (possibly compressed) resource file atomically and return its index entry.
+
+    The resource is written to a (hidden) temporary file first and then renamed, so that readers
+    never observe a partially written file.
+
+    Raw `data` (or data the resource was loaded from) is written as is. The content hash of such a
+    resource is only indexed if it is already known; otherwise, it is computed when needed.
+
+    """
+    dirname, basename = split(path)
+    temp_path = join(dirname, ".{}.{}.tmp".format(basename, getpid()))
+    if data is None:
+        data = formatter.value.raw_data(resource)
+    if data is None:
+        resource = as_dict(resource)
+        data = formatter.value.dump(resource)
+        resource_hash = content_hash(resource)
+    else:
+        resource_hash = getattr(resource, "content_hash", None)
+    data = data.encode("utf-8")
+    with open(temp_path, "wb") as file_:
+        file_.write(compression.compress(data) if compression else data)
+    replace(temp_path, path)
+
+    stat_result = stat(path)
+    return IndexEntry(location, stat_result.st_size, stat_result.st_mtime_ns, *identity, resource_hash)
+
+
+def write_files(writes, formatter_name, compression_name=None):
+    # NB: formatters are passed by name because their values do not survive pickling
+    formatter = Formatters[formatter_name]
+    compression = Compression[compression_name] if compression_name else None
+    return [
+        write_file(*write, formatter=formatter, compression=compression)
+        for write in writes
+    ]
+
+
+class DirectoryLayout:
+    """
+    The layout of resource files within a directory tree.
+
+    The flat layout stores resources as `<type>/<id>.<ext>`. Sharded layouts add `shard_depth` levels of
+    sub-directories named by a prefix of the id's hash (e.g. `<type>/ab/cd/<id>.<ext>`), each with a fan-out
+    of `16 ** shard_width` directories, so that no directory grows too large.
+
+    """
+    VERSION = 1
+
+    def __init__(self, shard_depth=0, shard_width=2):
+        self.shard_depth = shard_depth
+        self.shard_width = shard_width
+
+    def __repr__(self):
+        return "{}({}, {})".format(
+            self.__class__.__name__,
+            self.shard_depth,
+            self.shard_width,
+        )
+
+    def __eq__(self, other):
+        return self.__class__ == other.__class__ and vars(self) == vars(other)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a layout marker, returning `None` if there is no marker (e.g. for flat exports).
+
+        """
+        if not exists(path):
+            return None
+
+        try:
+            with open(path) as file_:
+                data = load(file_)
+            if data["version"] != cls.VERSION:
+                raise ValueError("Unsupported layout version: {}".format(data["version"]))
+            return cls(data["shard_depth"], data["shard_width"])
+        except (KeyError, ValueError) as error:
+            raise ClickException("Invalid layout marker: {}: {}".format(path, error))
+
+    def save(self, path):
+        temp_path = "{}.tmp".format(path)
+        with open(temp_path, "w") as file_:
+            dump(dict(version=self.VERSION, **vars(self)), file_, sort_keys=True)
+        replace(temp_path, path)
+
+    def location_for(self, type, id, extension):
+        """
+        Compute the location of a resource file relative to the directory.
+
+        """
+        basename = "{}{}".format(id, extension)
+        if not self.shard_depth:
+            return join(type, basename)
+
+        digest = sha256(str(id).encode("utf-8")).hexdigest()
+        shards = [
+            digest[level * self.shard_width:(level + 1) * self.shard_width]
+            for level in range(self.shard_depth)
+        ]
+        return join(type, *shards, basename)
 
 
 class DirectoryEndpoint(Endpoint):
@@ -37,46 +226,250 @@ class DirectoryEndpoint(Endpoint):
     def __eq__(self, other):
         return self.__class__ == other.__class__ and self.path == other.path
 
-    def read(self, schema_cls, **kwargs):
+    @property
+    def index_path(self):
+        return join(self.path, INDEX_NAME)
+
+    @property
+    def layout_path(self):
+        return join(self.path, LAYOUT_NAME)
+
+    def read(self, schema_cls, read_workers=1, formatter=None, **kwargs):
         """
         Read all YAML documents from the directory.
 
+        Both flat and sharded layouts are read by walking the whole tree. Files are read in a
+        deterministic (sorted) order. With more than one worker, files are parsed in chunks by a pool of
+        processes.
+
+        Files that are unchanged since they were indexed are not parsed at all; instead, their
+        resources are loaded lazily.
+
+        Resources in the same format as the `formatter` keep their raw data, so that they can be
+        written without being dumped again.
+
+        """
+        raw_extension = formatter.value.extension if formatter else None
+        paths = self.iter_paths(self.path)
+
+        index = ResourceIndex.load(self.index_path, schema_cls)
+        if index is not None:
+            paths = yield from self.read_indexed(index, paths, raw_extension)
+
+        if read_workers == 1:
+            for path in paths:
+                dct, raw = load_resource_file(path, raw_extension)
+                yield schema_cls(dct).with_raw(raw)
+            return
+
+        with ProcessPoolExecutor(max_workers=read_workers) as executor:
+            func = partial(load_files, raw_extension=raw_extension)
+            for results in imap_bounded(executor, func, chunked(paths, READ_CHUNK_SIZE), 2 * read_workers):
+                for dct, raw in results:
+                    yield schema_cls(dct).with_raw(raw)
+
+    def read_indexed(self, index, paths, raw_extension=None):
         """
-        for dirpath, dirnames, filenames in walk(self.path):
-            for filename in filenames:
-                if filename.startswith("."):
-                    continue
-                _, ext = splitext(filename)
-                formatter = Formatters.for_extension(ext).value
-                with open(join(dirpath, filename), "r") as file_:
-                    data = file_.read()
-                    dct = formatter.load(data)
-                    yield schema_cls(dct)
+        Generate lazy resources for indexed files, returning the paths of all other files.
 
-    def write(self, resources, formatter, remove=False, **kwargs):
+        """
+        unindexed_paths = []
+        for path in paths:
+            entry = index.entries.get(relpath(path, self.path))
+            stat_result = stat(path)
+            if entry is None or (entry.size, entry.mtime_ns) != (stat_result.st_size, stat_result.st_mtime_ns):
+                unindexed_paths.append(path)
+                continue
+
+            yield LazyResource(
+                entry.uri,
+                entry.type,
+                entry.id,
+                entry.parents,
+                partial(load_file, path),
+                entry.content_hash,
+                partial(load_raw_file, path) if formatter_for(path).extension == raw_extension else None,
+            )
+
+        return unindexed_paths
+
+    def iter_paths(self, path):
+        """
+        Generate the paths of all (non-hidden) files in a directory tree in sorted order.
+
+        """
+        with scandir(path) as iterator:
+            entries = sorted(
+                (entry for entry in iterator if not entry.name.startswith(".")),
+                key=lambda entry: entry.name,
+            )
+
+        for entry in entries:
+            if entry.is_dir():
+                yield from self.iter_paths(entry.path)
+            else:
+                yield entry.path
+
+    def write(
+        self,
+        resources,
+        formatter,
+        remove=False,
+        write_workers=1,
+        schema_cls=None,
+        shard_depth=None,
+        shard_width=2,
+        compression=None,
+        stream=False,
+        **kwargs
+    ):
         """
         Write resources to the directory tree.
 
+        Existing directories keep the layout recorded in their marker; otherwise, the layout is flat unless
+        `shard_depth` is given. Files are written atomically (and compressed individually, if requested).
+        With more than one worker, resources are serialized and written in chunks by a pool of processes.
+
+        Written files are added to the directory's index, except when streaming (because the index holds an
+        entry for every resource in memory). Files rewritten without updating the index are detected as
+        changed when read.
+
         """
+        start, count = default_timer(), 0
+        layout = self.load_layout_for_write(shard_depth, shard_width)
+        writes = self.iter_writes(resources, formatter, layout, compression)
+        index = self.load_index_for_write(schema_cls) if not stream else None
+
+        if write_workers == 1:
+            entries = (write_file(*write, formatter=formatter, compression=compression) for write in writes)
+        else:
+            executor = ProcessPoolExecutor(max_workers=write_workers)
+            func = partial(
+                write_files,
+                formatter_name=formatter.name,
+                compression_name=compression.name if compression else None,
+            )
+            entries = chain.from_iterable(
+                imap_bounded(executor, func, chunked(writes, WRITE_CHUNK_SIZE), 2 * write_workers),
+            )
+
+        try:
+            for entry in entries:
+                count += 1
+                if index is not None:
+                    index.add(entry)
+        finally:
+            if write_workers > 1:
+                executor.shutdown()
+
+        if index is not None:
+            index.save()
+
+        elapsed = default_timer() - start
+        echo("Wrote {} file(s) in {:.1f}s ({:.0f} files/sec)".format(
+            count,
+            elapsed,
+            count / elapsed if elapsed else 0,
+        ), err=True)
+
+    def load_layout_for_write(self, shard_depth, shard_width):
+        """
+        Load (or record) the layout to use when writing.
+
+        """
+        layout = DirectoryLayout.load(self.layout_path)
+        if layout is not None:
+            return layout
+
+        layout = DirectoryLayout(shard_depth or 0, shard_width)
+        if layout.shard_depth:
+            self.mkdir(self.path)
+            layout.save(self.layout_path)
+        return layout
+
+    def load_index_for_write(self, schema_cls):
+        """
+        Load the index to update when writing.
+
+        """
+        if schema_cls is None:
+            return None
+
+        self.mkdir(self.path)
+        return ResourceIndex.load(self.index_path, schema_cls) or ResourceIndex(self.index_path, schema_cls)
+
+    def iter_writes(self, resources, formatter, layout, compression=None):
+        """
+        Generate the arguments for writing each file, creating each directory only once.
+
+        """
+        extension = formatter.value.extension + (compression.extension if compression else "")
+        dirnames = set()
         for resource in resources:
             assert resource.type is not None
             assert resource.id is not None
 
-            dirname = join(self.path, resource.type)
-            basename = "{}{}".format(resource.id, formatter.value.extension)
-            self.mkdir(dirname)
-            path = join(dirname, basename)
-            with open(path, "w") as file_:
-                file_.write(formatter.value.dump(resource))
+            location = layout.location_for(resource.type, resource.id, extension)
+            dirname = join(self.path, split(location)[0])
+            if dirname not in dirnames:
+                self.mkdir(dirname)
+                dirnames.add(dirname)
+
+            portable_resource, data = self.portable(resource, formatter)
+            yield join(self.path, location), location, portable_resource, identity_of(resource), data
+
+    def portable(self, resource, formatter):
+        """
+        Prepare a resource to be sent to a writer as a `(resource, data)` pair.
+
+        Raw data that may be written as is is passed instead of the resource's content; lazy resources
+        load their raw data (if any) in the writer.
+
+        """
+        if isinstance(resource, LazyResource):
+            if resource.raw_loader is not None:
+                return resource, None
+            return as_dict(resource), None
+
+        data = formatter.value.raw_data(resource)
+        if data is not None:
+            return None, data
+        return as_dict(resource), None
+
+    def content_hashes(self, schema_cls, **kwargs):
+        """
+        Compute the content hashes of the resources in the directory tree.
+
+        """
+        if not exists(self.path):
+            return dict()
+
+        return {
+            resource.uri: content_hash(resource)
+            for resource in self.read(schema_cls, **kwargs)
+        }
 
     def validate_for_read(self, schema_cls, **kwargs):
         if not exists(self.path) or not isdir(self.path):
             raise ClickException("Not such directory: {}".format(self.path))
 
-    def validate_for_write(self, formatter, remove=False, **kwargs):
+        # fail early on unsupported layouts
+        DirectoryLayout.load(self.layout_path)
+
+    def validate_for_write(self, formatter, remove=False, shard_depth=None, shard_width=2, **kwargs):
         if exists(self.path) and not isdir(self.path):
             raise ClickException("Not a directory: {}".format(self.path))
 
         if exists(self.path) and remove:
             # remove tree
             rmtree(self.path)
+
+        if shard_depth is None or not exists(self.path):
+            return
+
+        # do not mix layouts within the same directory
+        layout = DirectoryLayout.load(self.layout_path)
+        if layout is None and any(True for _ in self.iter_paths(self.path)):
+            layout = DirectoryLayout()
+        if layout is not None and layout != DirectoryLayout(shard_depth, shard_width):
+            raise ClickException("Directory already uses {}; perhaps you mean to use '--rm'?".format(layout))
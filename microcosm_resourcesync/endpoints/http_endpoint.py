@@ -2,23 +2,55 @@
 HTTP endpoint.
 
 """
+from collections.abc import Sized
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from contextlib import closing
 from os.path import commonprefix
 from sys import stderr
+from threading import local
+from time import sleep
+from timeit import default_timer
 from urllib.parse import urlparse, urlunparse
 
-from click import echo, progressbar
+from click import ClickException, echo, progressbar
 from requests import Session
-from requests.exceptions import ConnectionError, HTTPError
+from requests.exceptions import ConnectionError
 
-from microcosm_resourcesync.batching import batched
+from microcosm_resourcesync.batching import AdaptiveBatchSize, batched
+from microcosm_resourcesync.caching import ResponseCache
 from microcosm_resourcesync.endpoints.base import Endpoint
+from microcosm_resourcesync.following import CrawlOrder, Frontier
 from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.parallel import chunked
+from microcosm_resourcesync.ratelimiting import (
+    RETRYABLE_STATUS_CODES,
+    THROTTLED_STATUS_CODES,
+    RateLimiter,
+    backoff_delay,
+)
+from microcosm_resourcesync.streaming import iter_json_items
+from microcosm_resourcesync.toposort import toposorted_levels
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# the number of streamed resources sorted into waves at a time
+STREAM_WINDOW_SIZE = 10000
 
 
 class BatchingNotSupported(Exception):
     pass
 
 
+class BatchTooLarge(Exception):
+    pass
+
+
 class HTTPEndpoint(Endpoint):
     """
     Read and write resources for an HTTP URI.
@@ -27,6 +59,7 @@ class HTTPEndpoint(Endpoint):
     def __init__(self, uri):
         self.uri = uri
         self.session = Session()
+        self.worker_sessions = local()
         self.allowed_methods_cache = dict()
 
     def __repr__(self):
@@ -42,52 +75,108 @@ class HTTPEndpoint(Endpoint):
     def default_formatter(self):
         return Formatters.JSON.name
 
-    def read(self, schema_cls, follow_mode, **kwargs):
+    def read(self, schema_cls, follow_mode, read_concurrency=1, crawl_order=CrawlOrder.PAGE_FIRST,
+             cache_dir=None, cache_size=1024, **kwargs):
         """
         Read all YAML documents from the file.
 
         """
-        deque, seen = [self.uri], set()
+        response_cache = ResponseCache(cache_dir, cache_size * 1024 * 1024) if cache_dir else None
+        frontier = Frontier(self.uri, crawl_order)
 
-        while deque:
-            uri = deque.pop()
-            if uri in seen:
-                continue
+        if read_concurrency > 1:
+            yield from self.read_concurrently(
+                frontier, schema_cls, follow_mode, read_concurrency, response_cache=response_cache, **kwargs
+            )
+        else:
+            yield from self.read_serially(frontier, schema_cls, follow_mode, response_cache=response_cache, **kwargs)
 
-            resource_data = self.read_resource_data(uri, **kwargs)
-            for resource in self.iter_resources(resource_data, schema_cls):
-                try:
-                    resource.id
-                    if resource.uri not in seen:
-                        yield resource
-                        seen.add(resource.uri)
-                except Exception:
-                    # ignore resources that do not have identifiers (e.g. collections)
-                    pass
-
-                # expand resource links, preferring pagination because it returns batches
-                page_links = [
-                    link.uri
-                    for link in resource.links(follow_mode)
-                    if link.uri not in seen and link.relation in ("prev", "next")
-                ]
-                other_links = [
-                    link.uri
-                    for link in resource.links(follow_mode)
-                    if link.uri not in seen and link.relation not in ("prev", "next")
-                ]
-                deque = other_links + deque + page_links
-
-            # done processing this uri (in paginated cases, this uri won't match any resource.uri)
-            seen.add(uri)
-
-    def read_resource_data(self, uri, verbose, limit, auth=None, **kwargs):
+        if response_cache is not None:
+            echo("Response cache: {} hit(s), {} miss(es)".format(
+                response_cache.hits,
+                response_cache.misses,
+            ), err=True)
+
+    def read_serially(self, frontier, schema_cls, follow_mode, **kwargs):
         """
-        Read resource data from a URI.
+        Crawl resources one URI at a time.
+
+        """
+        while frontier:
+            uri = frontier.pop()
+            if uri is None:
+                break
+
+            yield from self.visit(uri, self.fetch_resources(uri, schema_cls, **kwargs), follow_mode, frontier)
+
+    def read_concurrently(self, frontier, schema_cls, follow_mode, read_concurrency, **kwargs):
+        """
+        Crawl resources, fetching up to `read_concurrency` URIs from the frontier at a time.
+
+        Resources are yielded as their responses complete, so the order of resources may differ
+        from `read_serially`; every resource is still yielded exactly once.
+
+        """
+        pending = dict()
+
+        with ThreadPoolExecutor(max_workers=read_concurrency) as executor:
+            while frontier or pending:
+                # keep the pool busy, skipping URIs that are already in flight
+                while frontier and len(pending) < read_concurrency:
+                    uri = frontier.pop()
+                    if uri is None or uri in pending.values():
+                        continue
+                    future = executor.submit(self.read_resource_data_for_worker, uri, **kwargs)
+                    pending[future] = uri
+
+                if not pending:
+                    continue
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    uri = pending.pop(future)
+                    resources = self.iter_resources(future.result(), schema_cls)
+                    yield from self.visit(uri, resources, follow_mode, frontier)
+
+    def visit(self, uri, resources, follow_mode, frontier):
+        """
+        Generate the unseen resources fetched from a URI and expand the crawl frontier.
+
+        """
+        for resource in resources:
+            try:
+                resource.id
+                if resource.uri not in frontier.seen:
+                    yield resource
+                    frontier.seen.add(resource.uri)
+            except Exception:
+                # ignore resources that do not have identifiers (e.g. collections)
+                pass
+
+            frontier.push(resource.links(follow_mode))
+
+        # done processing this uri (in paginated cases, this uri won't match any resource.uri)
+        frontier.seen.add(uri)
+
+    def fetch_resources(self, uri, schema_cls, stream_items=False, **kwargs):
+        """
+        Fetch the resource(s) for a URI.
+
+        """
+        if stream_items:
+            return self.stream_resources(uri, schema_cls, **kwargs)
+        return self.iter_resources(self.read_resource_data(uri, **kwargs), schema_cls)
+
+    def stream_resources(self, uri, schema_cls, verbose, limit, auth=None, **kwargs):
+        """
+        Fetch the resource(s) for a URI, parsing embedded resources as they are received.
+
+        The embedded resources of JSON responses are generated without loading the whole response into
+        memory; the (embedding) resource itself is generated last. Responses are not cached.
 
         """
         if verbose:
-            echo("Fetching resource(s) from: {}".format(uri), err=True)
+            echo("Streaming resource(s) from: {}".format(uri), err=True)
 
         response = self.session.get(
             uri,
@@ -95,25 +184,167 @@ class HTTPEndpoint(Endpoint):
                 "X-Request-Limit": str(limit),
             },
             auth=auth,
+            stream=True,
         )
+        with closing(response):
+            if verbose and response.status_code >= 400:
+                echo("Failed fetching resource(s) from: {}: {}".format(uri, response.text))
+            response.raise_for_status()
+            formatter = Formatters.for_content_type(response.headers["Content-Type"])
+
+            if formatter != Formatters.JSON:
+                yield from self.iter_resources(formatter.value.load(response.text), schema_cls)
+                return
+
+            envelope = dict()
+            for embedded_resource in iter_json_items(
+                response.iter_content(chunk_size=STREAM_CHUNK_SIZE),
+                envelope,
+                schema_cls.embedded_key,
+            ):
+                yield schema_cls(embedded_resource)
+
+            yield schema_cls(envelope)
+
+    def worker_session(self):
+        """
+        Get the session that belongs to the current (worker) thread.
+
+        Sessions are not shared between threads, but each worker reuses its own connections.
+
+        """
+        session = getattr(self.worker_sessions, "session", None)
+        if session is None:
+            session = self.worker_sessions.session = Session()
+        return session
+
+    def read_resource_data_for_worker(self, uri, **kwargs):
+        """
+        Read resource data from a URI using a session that belongs to the current (worker) thread.
+
+        """
+        return self.read_resource_data(uri, session=self.worker_session(), **kwargs)
+
+    def read_resource_data(self, uri, verbose, limit, auth=None, session=None, response_cache=None, **kwargs):
+        """
+        Read resource data from a URI.
+
+        If a response cache is used, previously cached data is revalidated with a conditional request
+        and reused if the resource has not been modified.
+
+        """
+        if verbose:
+            echo("Fetching resource(s) from: {}".format(uri), err=True)
+
+        headers = {
+            "X-Request-Limit": str(limit),
+        }
+        if response_cache is not None:
+            cache_key = response_cache.key(uri, auth, limit)
+            cache_entry = response_cache.get(cache_key)
+            headers.update(response_cache.conditional_headers(cache_entry))
+
+        response = (session or self.session).get(
+            uri,
+            headers=headers,
+            auth=auth,
+        )
+        if response_cache is not None and cache_entry is not None and response.status_code == 304:
+            response_cache.record_hit()
+            return cache_entry["data"]
+
         # NB: if resources have broken hyperlinks, we can get a 404 here
         if verbose and response.status_code >= 400:
             echo("Failed fetching resource(s) from: {}: {}".format(uri, response.text))
         response.raise_for_status()
         content_type = response.headers["Content-Type"]
         formatter = Formatters.for_content_type(content_type).value
-        return formatter.load(response.text)
+        resource_data = formatter.load(response.text)
 
-    def write(self, resources, **kwargs):
+        if response_cache is not None:
+            response_cache.record_miss()
+            response_cache.put(cache_key, response.headers, resource_data)
+
+        return resource_data
+
+    def write(self, resources, write_concurrency=1, adaptive_batching=False, target_latency=1.0,
+              rate_limit=None, max_in_flight=None, adaptive_rate=False, **kwargs):
         """
         Write resources as YAML to an HTTP endpoint.
 
+        Resources may be any iterable (including a generator); progress is shown as a count if the
+        number of resources is not known in advance.
+
         """
-        with progressbar(length=len(resources), file=stderr) as progress_bar:
+        if adaptive_batching:
+            # batches of one resource are written individually and would never adapt
+            kwargs.update(batch_sizer=AdaptiveBatchSize(max(2, kwargs["batch_size"]), target_latency))
+
+        # an adaptive rate needs somewhere to start
+        if adaptive_rate and rate_limit is None:
+            rate_limit = 10.0
+        kwargs.update(rate_limiter=RateLimiter(rate_limit, max_in_flight, adaptive_rate))
+
+        # NB: the progress bar is only given the resources to (try to) compute its length
+        length = len(resources) if isinstance(resources, Sized) else None
+        with progressbar(resources, length=length, file=stderr) as progress_bar:
+            if write_concurrency > 1:
+                self.write_concurrently(resources, progress_bar, write_concurrency, **kwargs)
+                return
+
             for resource_batch in batched(resources, **kwargs):
                 self.write_resources(resource_batch, **kwargs)
                 progress_bar.update(len(resource_batch))
 
+    def write_concurrently(self, resources, progress_bar, write_concurrency, **kwargs):
+        """
+        Write resources one dependency wave at a time, writing the batches within a wave concurrently.
+
+        Resources in the same wave never depend on each other, so only waves need to be serialized.
+        Streamed (non-list) resources must already be sorted; their waves are computed within windows
+        of resources so that memory stays bounded.
+
+        """
+        windows = [resources] if isinstance(resources, list) else chunked(resources, STREAM_WINDOW_SIZE)
+        waves = (wave for window in windows for wave in toposorted_levels(window))
+
+        with ThreadPoolExecutor(max_workers=write_concurrency) as executor:
+            for wave in waves:
+                futures = {
+                    executor.submit(self.write_resources_for_worker, resource_batch, **kwargs): len(resource_batch)
+                    for resource_batch in batched(wave, **kwargs)
+                }
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                        progress_bar.update(futures[future])
+                except Exception:
+                    # do not start any more writes once a write has failed
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+    def validate_for_read(self, schema_cls, read_concurrency=1, stream_items=False, **kwargs):
+        # concurrent reads load whole responses in worker threads
+        if read_concurrency > 1 and stream_items:
+            raise ClickException("Cannot use --stream-items with --read-concurrency")
+
+    def validate_for_write(self, formatter, incremental=False, manifest_path=None, **kwargs):
+        # resources are sent as JSON (or YAML) documents, never as JSON Lines
+        if formatter == Formatters.JSONL:
+            raise ClickException("Cannot use {} format {}".format(formatter.name, self.__class__.__name__))
+
+        # the current content of an HTTP endpoint is not known without crawling it
+        if incremental and not manifest_path:
+            raise ClickException("--incremental requires a --manifest for {}".format(self.__class__.__name__))
+
+    def write_resources_for_worker(self, resource_batch, **kwargs):
+        """
+        Write several resources using a session that belongs to the current (worker) thread.
+
+        """
+        self.write_resources(resource_batch, session=self.worker_session(), **kwargs)
+
     def write_resources(self, resource_batch, **kwargs):
         """
         Write several resources.
@@ -127,24 +358,34 @@ class HTTPEndpoint(Endpoint):
         except BatchingNotSupported:
             # fall through
             pass
+        except BatchTooLarge:
+            # split the batch and try again
+            middle = len(resource_batch) // 2
+            self.write_resources(resource_batch[:middle], **kwargs)
+            self.write_resources(resource_batch[middle:], **kwargs)
+            return
 
         # write resources once at a time
         for resource in resource_batch:
             self.write_resource(resource, **kwargs)
 
-    def write_resource_batch(self, resource_batch, formatter, max_attempts=2, verbose=False, auth=None, **kwargs):
+    def write_resource_batch(self, resource_batch, formatter, max_attempts=2, verbose=False, auth=None,
+                             batch_sizer=None, rate_limiter=None, backoff=0.5, session=None, **kwargs):
         """
         Write resources in a batch.
 
         Uses the microcosm `BatchUpdate` convention to PATCH the base collection URI.
 
+        Raises `BatchTooLarge` if the server rejects the batch as too large (413) or times out (504).
+
         """
         uri = commonprefix([
             self.join_uri(resource.uri)
             for resource in resource_batch
         ]).rstrip("/")
 
-        allowed_methods = self.get_allowed_methods(uri)
+        session = session or self.session
+        allowed_methods = self.get_allowed_methods(uri, session)
 
         if "PATCH" not in allowed_methods:
             raise BatchingNotSupported()
@@ -152,12 +393,17 @@ class HTTPEndpoint(Endpoint):
         if verbose:
             echo("Batch updating resource(s) for: {}".format(uri), err=True)
 
-        data = formatter.value.dump(dict(
-            items=resource_batch,
-        ))
+        # reuse any data serialized while batching
+        batch_data = getattr(resource_batch, "data", None)
+        data = formatter.value.dump_items(batch_data) if batch_data else None
+        if data is None:
+            data = formatter.value.dump(dict(
+                items=resource_batch,
+            ))
 
+        start = default_timer()
         response = self.retry(
-            self.session.patch,
+            session.patch,
             uri=uri,
             auth=auth,
             data=data,
@@ -165,10 +411,21 @@ class HTTPEndpoint(Endpoint):
                 "Content-Type": formatter.value.preferred_mime_type,
             },
             max_attempts=max_attempts,
+            rate_limiter=rate_limiter,
+            backoff=backoff,
         )
+        if response.status_code in (413, 504):
+            if verbose:
+                echo("Batch of {} resource(s) rejected for: {}".format(len(resource_batch), uri), err=True)
+            if batch_sizer is not None:
+                batch_sizer.record_failure(len(resource_batch))
+            raise BatchTooLarge()
         response.raise_for_status()
 
-    def get_allowed_methods(self, uri):
+        if batch_sizer is not None:
+            batch_sizer.record_success(len(resource_batch), default_timer() - start)
+
+    def get_allowed_methods(self, uri, session=None):
         """
         Use an OPTIONS query to compute the allowed methods for a URI.
 
@@ -177,25 +434,27 @@ class HTTPEndpoint(Endpoint):
         """
         if uri in self.allowed_methods_cache:
             return self.allowed_methods_cache[uri]
-        response = self.session.options(uri)
+        response = (session or self.session).options(uri)
         allowed_methods = response.headers.get("Allow", [])
         self.allowed_methods_cache[uri] = allowed_methods
         return allowed_methods
 
-    def write_resource(self, resource, formatter, max_attempts, auth=None, **kwargs):
+    def write_resource(self, resource, formatter, max_attempts, auth=None, rate_limiter=None, backoff=0.5,
+                       batch_sizer=None, session=None, **kwargs):
         """
         Write a single resource via Replace conntetion (PUT).
 
         """
         uri = self.join_uri(resource.uri)
-        data = formatter.value.dump(resource)
+        data = formatter.value.serialize(resource)
 
         # NB: verbose logging the message content is obnoxius and interferes with the
         # progressbar; if we need more information here, we probably need more levels
         # of verbosity and a more traditional progress bar
 
+        start = default_timer()
         response = self.retry(
-            self.session.put,
+            (session or self.session).put,
             uri=uri,
             auth=auth,
             data=data,
@@ -203,9 +462,15 @@ class HTTPEndpoint(Endpoint):
                 "Content-Type": formatter.value.preferred_mime_type,
             },
             max_attempts=max_attempts,
+            rate_limiter=rate_limiter,
+            backoff=backoff,
         )
         response.raise_for_status()
 
+        # single writes (e.g. after a batch was split down to one resource) let the batch size recover
+        if batch_sizer is not None:
+            batch_sizer.record_success(1, default_timer() - start)
+
     def join_uri(self, uri):
         """
         Construct a URL using the configured base URL's scheme and netloc and the remainder of the resource's URI.
@@ -233,27 +498,37 @@ class HTTPEndpoint(Endpoint):
         for embedded_resource in resource.embedded:
             yield schema_cls(embedded_resource)
 
-    def retry(self, func, uri, max_attempts, **kwargs):
+    def retry(self, func, uri, max_attempts, rate_limiter=None, backoff=0.5, **kwargs):
         """
-        Retry HTTP operations on connection failures.
+        Retry HTTP operations on connection failures and transient (e.g. 429 or 503) responses.
+
+        Waits between attempts using exponential backoff with jitter, unless the server specifies how
+        long to wait using `Retry-After`. Every attempt is subject to the (shared) rate limiter.
 
         """
+        rate_limiter = rate_limiter or RateLimiter()
         last_error = None
         for attempt in range(max_attempts):
             try:
-                return func(uri, **kwargs)
+                with rate_limiter:
+                    response = func(uri, **kwargs)
             except ConnectionError as error:
                 echo("Connection error for uri: {}: {}".format(uri, error), err=True)
                 last_error = error
+                if attempt + 1 < max_attempts:
+                    sleep(backoff_delay(attempt, backoff))
                 continue
-            except HTTPError as error:
-                if error.response.status_code in (504, 502):
-                    echo("HTTP error for uri: {}: {}".format(uri, error), err=True)
-                    last_error = error
-                    continue
-                raise
+
+            if response.status_code in THROTTLED_STATUS_CODES:
+                rate_limiter.record_throttled()
             else:
-                break
-        else:
-            # If we reached here, all attempts were unsuccessful - raise last error encountered
-            raise last_error
+                rate_limiter.record_success()
+
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt + 1 == max_attempts:
+                return response
+
+            echo("HTTP error for uri: {}: {}".format(uri, response.status_code), err=True)
+            sleep(backoff_delay(attempt, backoff, retry_after=response.headers.get("Retry-After")))
+
+        # If we reached here, all attempts were unsuccessful - raise last error encountered
+        raise last_error
@@ -0,0 +1,116 @@
+"""
+Read/write from a JSON Lines file.
+
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from os import unlink
+from os.path import dirname, exists
+
+from click import ClickException
+
+from microcosm_resourcesync.compression import detect_compression, open_compressed, split_compression
+from microcosm_resourcesync.endpoints.base import Endpoint
+from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.parallel import imap_bounded
+from microcosm_resourcesync.schemas.base import Raw
+from microcosm_resourcesync.splitting import (
+    find_line_boundary,
+    iter_ranges,
+    load_line_range,
+    load_lines,
+    load_raw_lines,
+)
+
+
+class JSONLinesFileEndpoint(Endpoint):
+    """
+    Read and write resources for a single JSON Lines file (one resource per line).
+
+    JSON Lines files are much faster to parse and emit than YAML files and can be split at any line,
+    which makes them well-suited to very large dumps.
+
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def __repr__(self):
+        return "{}('{}')".format(
+            self.__class__.__name__,
+            self.path,
+        )
+
+    def __eq__(self, other):
+        return self.__class__ == other.__class__ and self.path == other.path
+
+    @property
+    def default_formatter(self):
+        return Formatters.JSONL.name
+
+    @property
+    def compression(self):
+        return split_compression(self.path)[1]
+
+    def read(self, schema_cls, read_workers=1, compress_threads=1, formatter=None, **kwargs):
+        """
+        Read all lines from the file.
+
+        Compressed files (detected by magic bytes) are decompressed as a stream. Otherwise, with more
+        than one worker, the file is split at line boundaries and the chunks are parsed by a pool of
+        processes.
+
+        When writing JSON Lines, lines that are read sequentially keep their raw data, so that they can
+        be written without being dumped again.
+
+        """
+        if read_workers == 1 or detect_compression(self.path) is not None:
+            with open_compressed(self.path, "r", threads=compress_threads) as stream:
+                if formatter == Formatters.JSONL:
+                    for raw_resource, line in load_raw_lines(stream):
+                        yield schema_cls(raw_resource).with_raw(Raw(Formatters.JSONL.value.extension, line))
+                else:
+                    for raw_resource in load_lines(stream):
+                        yield schema_cls(raw_resource)
+            return
+
+        ranges = iter_ranges(self.path, find_boundary=find_line_boundary, is_splittable=bool)
+        with ProcessPoolExecutor(max_workers=read_workers) as executor:
+            func = partial(load_line_range, self.path)
+            for raw_resources in imap_bounded(executor, func, ranges, 2 * read_workers):
+                for raw_resource in raw_resources:
+                    yield schema_cls(raw_resource)
+
+    def write(self, resources, formatter, compress_threads=1, **kwargs):
+        """
+        Write resources to the file, one per line.
+
+        Files with a compression extension are compressed as a stream. Resources with raw JSON Lines
+        data are written as is.
+
+        """
+        with open_compressed(self.path, "a", self.compression, compress_threads) as stream:
+            for resource in resources:
+                stream.write(formatter.value.serialize(resource))
+
+    def validate_for_write(self, formatter, remove=False, incremental=False, **kwargs):
+        # skipping unchanged resources would omit them from the file
+        if incremental:
+            raise ClickException("Cannot use --incremental with {}".format(self.__class__.__name__))
+
+        # must use the correct formatter (every resource must be on its own line)
+        if formatter != Formatters.JSONL:
+            raise ClickException("Cannot use {} format JSONLinesFileEndpoint".format(
+                formatter.name
+            ))
+
+        # handle existing files
+        if exists(self.path):
+            if remove:
+                unlink(self.path)
+            else:
+                raise ClickException("File already exists: {}; perhaps you mean to use '--rm'?".format(
+                    self.path,
+                ))
+
+        # create directories
+        self.mkdir(dirname(self.path))
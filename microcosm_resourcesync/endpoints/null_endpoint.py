@@ -2,6 +2,8 @@
 Endpoint interface
 
 """
+from collections import deque
+
 from microcosm_resourcesync.endpoints.base import Endpoint
 
 
@@ -16,10 +18,13 @@ class NullEndpoint(Endpoint):
 
     def write(self, resources, formatter, **kwargs):
         """
-        Write resources using the given formatter.
+        Discard resources.
+
+        Resources are still consumed, so that lazily read (e.g. streamed) inputs are parsed and their errors
+        are raised.
 
         """
-        pass
+        deque(resources, maxlen=0)
 
     def __repr__(self):
         return "{}()".format(
@@ -2,11 +2,45 @@
 Read/write from stdin/stdout
 
 """
+from itertools import chain
 from sys import stdin, stdout
 
-from yaml import safe_load_all
+from click import ClickException
 
+from microcosm_resourcesync.compression import MAGIC_SIZE, Compression, compressed_stream
 from microcosm_resourcesync.endpoints.base import Endpoint
+from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.formatters.json_codecs import default_codec
+from microcosm_resourcesync.schemas.base import Raw
+from microcosm_resourcesync.splitting import load_raw_documents, load_raw_lines
+
+
+def detect_format(lines):
+    """
+    Detect the format of input lines, returning the format and the (unconsumed) lines.
+
+    JSON Lines (or single line JSON) input starts with a line that is a complete object; anything
+    else (including multi-line JSON and YAML flow mappings) is read as YAML.
+
+    """
+    lines = iter(lines)
+    head = []
+    for line in lines:
+        head.append(line)
+        if line.strip():
+            break
+
+    input_format = Formatters.JSONL if head and is_json_object(head[-1]) else Formatters.YAML
+    return input_format, chain(head, lines)
+
+
+def is_json_object(line):
+    if not line.lstrip().startswith("{"):
+        return False
+    try:
+        return isinstance(default_codec().loads(line), dict)
+    except ValueError:
+        return False
 
 
 class PipeEndpoint(Endpoint):
@@ -20,16 +54,41 @@ class PipeEndpoint(Endpoint):
         # NB: allows origin to equal destination
         return False
 
-    def read(self, schema_cls, **kwargs):
-        raw_resources = safe_load_all(stdin)
+    def read(self, schema_cls, formatter=None, **kwargs):
+        """
+        Read resources from stdin, either as JSON Lines (one resource per line) or as YAML.
+
+        The input format is detected (independently of the output format) and compressed input
+        (detected by magic bytes) is decompressed as a stream.
+
+        When writing in the same format, resources keep their raw data, so that they can be written
+        without being dumped again.
+
+        """
+        compression = Compression.for_data(stdin.buffer.peek(MAGIC_SIZE)[:MAGIC_SIZE])
+        with compressed_stream(stdin.buffer, "r", compression) as stream:
+            input_format, lines = detect_format(stream)
+            if input_format == Formatters.JSONL:
+                raw_resources = load_raw_lines(lines)
+            else:
+                raw_resources = load_raw_documents(lines)
+
+            keep_raw = formatter == input_format
+            for raw_resource, data in raw_resources:
+                raw = Raw(input_format.value.extension, data) if keep_raw else None
+                yield schema_cls(raw_resource).with_raw(raw)
 
-        for raw_resource in raw_resources:
-            yield schema_cls(raw_resource)
+    def validate_for_write(self, formatter, incremental=False, **kwargs):
+        # skipping unchanged resources would omit them from the output
+        if incremental:
+            raise ClickException("Cannot use --incremental with {}".format(self.__class__.__name__))
 
-    def write(self, resources, formatter, **kwargs):
+    def write(self, resources, formatter, compression=None, compress_threads=1, **kwargs):
         """
-        Write resources as YAML to the file.
+        Write resources to stdout, compressing them as a stream if requested.
 
         """
-        for resource in resources:
-            stdout.write(formatter.value.dump(resource))
+        stdout.flush()
+        with compressed_stream(stdout.buffer, "w", compression, compress_threads) as stream:
+            for resource in resources:
+                stream.write(formatter.value.serialize(resource))
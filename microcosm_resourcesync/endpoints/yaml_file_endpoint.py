@@ -2,14 +2,47 @@
 Read/write from a YAML file.
 
 """
-from os import unlink
-from os.path import dirname, exists
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from os import stat, unlink
+from os.path import (
+    basename,
+    dirname,
+    exists,
+    join,
+)
 
 from click import ClickException
-from yaml import safe_load_all
 
+from microcosm_resourcesync.compression import detect_compression, open_compressed, split_compression
 from microcosm_resourcesync.endpoints.base import Endpoint
 from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.incremental import content_hash
+from microcosm_resourcesync.indexing import IndexEntry, ResourceIndex, identity_of
+from microcosm_resourcesync.parallel import imap_bounded
+from microcosm_resourcesync.schemas import LazyResource, as_dict
+from microcosm_resourcesync.schemas.base import Raw
+from microcosm_resourcesync.splitting import iter_ranges, load_documents, load_range, load_raw_documents
+
+
+def load_document(path, offset, size):
+    """
+    Load a single YAML document stored at a byte offset of a file.
+
+    """
+    with open(path, "rb") as file_:
+        file_.seek(offset)
+        return Formatters.YAML.value.load(file_.read(size))
+
+
+def load_raw_document(path, offset, size):
+    """
+    Load the data of a single YAML document stored at a byte offset of a file, without parsing it.
+
+    """
+    with open(path, "rb") as file_:
+        file_.seek(offset)
+        return Raw(Formatters.YAML.value.extension, file_.read(size).decode("utf-8"))
 
 
 class YAMLFileEndpoint(Endpoint):
@@ -32,27 +65,122 @@ class YAMLFileEndpoint(Endpoint):
     def __eq__(self, other):
         return self.__class__ == other.__class__ and self.path == other.path
 
-    def read(self, schema_cls, **kwargs):
+    @property
+    def index_path(self):
+        return join(dirname(self.path), ".{}.index.json".format(basename(self.path)))
+
+    @property
+    def compression(self):
+        return split_compression(self.path)[1]
+
+    def read(self, schema_cls, read_workers=1, compress_threads=1, formatter=None, **kwargs):
         """
         Read all YAML documents from the file.
 
-        """
-        with open(self.path) as file_:
-            raw_resources = safe_load_all(file_)
+        Compressed files (detected by magic bytes) are decompressed as a stream. Otherwise, if the file
+        is unchanged since it was indexed, documents are not parsed at all; instead, resources are
+        loaded lazily (by byte offset).
+
+        With more than one worker, the file is split at document boundaries and the chunks are parsed
+        by a pool of processes.
 
-            for raw_resource in raw_resources:
+        When writing YAML, documents that are read sequentially keep their raw data, so that they can
+        be written without being dumped again.
+
+        """
+        keep_raw = formatter == Formatters.YAML
+
+        if detect_compression(self.path) is not None:
+            with open_compressed(self.path, "r", threads=compress_threads) as stream:
+                yield from self.load_stream(stream, schema_cls, keep_raw)
+            return
+
+        index = ResourceIndex.load(self.index_path, schema_cls)
+        if index is not None and index.metadata.get("stat") == self.stat():
+            for entry in index.entries.values():
+                yield LazyResource(
+                    entry.uri,
+                    entry.type,
+                    entry.id,
+                    entry.parents,
+                    partial(load_document, self.path, entry.location, entry.size),
+                    entry.content_hash,
+                    partial(load_raw_document, self.path, entry.location, entry.size) if keep_raw else None,
+                )
+            return
+
+        ranges = iter_ranges(self.path) if read_workers > 1 else None
+        if ranges is None:
+            with open(self.path) as file_:
+                yield from self.load_stream(file_, schema_cls, keep_raw)
+            return
+
+        with ProcessPoolExecutor(max_workers=read_workers) as executor:
+            func = partial(load_range, self.path)
+            for raw_resources in imap_bounded(executor, func, ranges, 2 * read_workers):
+                for raw_resource in raw_resources:
+                    yield schema_cls(raw_resource)
+
+    def load_stream(self, stream, schema_cls, keep_raw=False):
+        if not keep_raw:
+            for raw_resource in load_documents(stream):
                 yield schema_cls(raw_resource)
+            return
 
-    def write(self, resources, formatter, remove=False, **kwargs):
+        for raw_resource, data in load_raw_documents(stream):
+            yield schema_cls(raw_resource).with_raw(Raw(Formatters.YAML.value.extension, data))
+
+    def write(self, resources, formatter, remove=False, schema_cls=None, compress_threads=1, stream=False, **kwargs):
         """
-        Write resources as YAML to the file.
+        Write resources as YAML to the file, indexing the byte offset of every document.
+
+        Files with a compression extension are compressed as a stream (and are not indexed). Streamed writes
+        are not indexed either, because the index holds an entry for every resource in memory.
+
+        Resources with raw YAML data are written as is.
 
         """
-        with open(self.path, "a") as file_:
+        if self.compression is not None:
+            with open_compressed(self.path, "a", self.compression, compress_threads) as stream:
+                for resource in resources:
+                    stream.write(formatter.value.serialize(resource))
+            return
+
+        index = ResourceIndex(self.index_path, schema_cls) if schema_cls is not None and not stream else None
+
+        with open(self.path, "ab") as file_:
             for resource in resources:
-                file_.write(formatter.value.dump(resource))
+                data = formatter.value.raw_data(resource)
+                if data is None:
+                    dct = as_dict(resource)
+                    data = formatter.value.dump(dct)
+                    resource_hash = content_hash(dct) if index is not None else None
+                else:
+                    # the content hash of raw data is computed when needed (if not already known)
+                    resource_hash = getattr(resource, "content_hash", None)
+                data = data.encode("utf-8")
+                if index is not None:
+                    offset = file_.tell()
+                    index.add(IndexEntry(offset, len(data), None, *identity_of(resource), resource_hash))
+                file_.write(data)
+
+        if index is not None:
+            # the index is only valid for the file as written
+            index.metadata["stat"] = self.stat()
+            index.save()
+
+    def stat(self):
+        try:
+            stat_result = stat(self.path)
+        except OSError:
+            return None
+        return [stat_result.st_size, stat_result.st_mtime_ns]
+
+    def validate_for_write(self, formatter, remove=False, incremental=False, **kwargs):
+        # skipping unchanged resources would omit them from the file
+        if incremental:
+            raise ClickException("Cannot use --incremental with {}".format(self.__class__.__name__))
 
-    def validate_for_write(self, formatter, remove=False, **kwargs):
         # must use the correct formatter (JSON doesn't support multi-document files)
         if formatter != Formatters.YAML:
             raise ClickException("Cannot use {} format YAMLFileEndpoint".format(
@@ -62,8 +190,10 @@ class YAMLFileEndpoint(Endpoint):
         # handle existing files
         if exists(self.path):
             if remove:
-                # remove
+                # remove (along with any index)
                 unlink(self.path)
+                if exists(self.index_path):
+                    unlink(self.index_path)
             else:
                 raise ClickException("File already exists: {}; perhaps you mean to use '--rm'?".format(
                     self.path,
@@ -2,6 +2,7 @@
 Following controls.
 
 """
+from collections import deque
 from enum import Enum, unique
 
 
@@ -20,3 +21,69 @@ class FollowMode(Enum):
     CHILD = u"CHILD"
     PAGE = u"PAGE"
     NONE = u"NONE"
+
+
+@unique
+class CrawlOrder(Enum):
+    """
+    Hypertext traversal order.
+
+     -  Follow pagination links first and other links in the order they were discovered (PAGE_FIRST)
+     -  Follow the most recently discovered links first (DEPTH_FIRST)
+     -  Follow the least recently discovered links first (BREADTH_FIRST)
+
+    """
+    PAGE_FIRST = u"PAGE_FIRST"
+    DEPTH_FIRST = u"DEPTH_FIRST"
+    BREADTH_FIRST = u"BREADTH_FIRST"
+
+
+class Frontier:
+    """
+    The URIs that remain to be crawled.
+
+    URIs are kept in a double-ended queue that is always popped from the right; the crawl order
+    decides on which end newly discovered links are pushed, so that both operations are O(1).
+
+    """
+    def __init__(self, uri, crawl_order=CrawlOrder.PAGE_FIRST):
+        self.crawl_order = crawl_order
+        self.uris = deque([uri])
+        self.seen = set()
+
+    def __len__(self):
+        return len(self.uris)
+
+    def pop(self):
+        """
+        Return the next URI to crawl or `None` if only seen URIs remain.
+
+        """
+        while self.uris:
+            uri = self.uris.pop()
+            if uri not in self.seen:
+                return uri
+        return None
+
+    def push(self, links):
+        """
+        Add unseen links to the frontier.
+
+        """
+        page_links, other_links = [], []
+        for link in links:
+            if link.uri in self.seen:
+                continue
+            if link.relation in ("prev", "next"):
+                page_links.append(link.uri)
+            else:
+                other_links.append(link.uri)
+
+        if self.crawl_order == CrawlOrder.PAGE_FIRST:
+            # prefer pagination because it returns batches; queue other links behind everything else
+            self.uris.extendleft(reversed(other_links))
+            self.uris.extend(page_links)
+        elif self.crawl_order == CrawlOrder.DEPTH_FIRST:
+            self.uris.extend(reversed(other_links + page_links))
+        else:
+            self.uris.extendleft(page_links + other_links)
@@ -5,12 +5,14 @@ Supported formatters
 from enum import Enum, unique
 
 from microcosm_resourcesync.formatters.json_formatter import JSONFormatter
+from microcosm_resourcesync.formatters.jsonl_formatter import JSONLinesFormatter
 from microcosm_resourcesync.formatters.yaml_formatter import YAMLFormatter
 
 
 @unique
 class Formatters(Enum):
     JSON = JSONFormatter()
+    JSONL = JSONLinesFormatter()
     YAML = YAMLFormatter()
 
     @classmethod
@@ -26,6 +26,41 @@ class Formatter(metaclass=ABCMeta):
         """
         pass
 
+    def dump_items(self, items):
+        """
+        Dump a batch (`dict(items=...)`) from its already serialized items, returning `None` if the
+        format cannot combine serialized data.
+
+        """
+        return None
+
+    def serialize(self, resource):
+        """
+        Dump a resource, passing through the data it was loaded from if it used this format.
+
+        """
+        data = self.raw_data(resource)
+        if data is None:
+            return self.dump(resource)
+        return data
+
+    def raw_data(self, resource):
+        """
+        Return the data a resource was loaded from, if it used this format and may be written as is.
+
+        """
+        raw = getattr(resource, "raw", None)
+        if raw is None or raw.extension != self.extension:
+            return None
+        return self.dump_raw(raw.data)
+
+    def dump_raw(self, data):
+        """
+        Prepare data in this format for writing, returning `None` if it cannot be written as is.
+
+        """
+        return data if data.endswith("\n") else data + "\n"
+
     @abstractproperty
     def mime_types(self):
         """
@@ -0,0 +1,93 @@
+"""
+JSON codecs.
+
+The standard library codec is always available; faster codecs are used when installed.
+
+"""
+from json import dumps, loads
+from re import compile as re_compile
+
+from microcosm_resourcesync.schemas.lazy import LazyResource
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# (possibly negative) integers that may not fit in 64 bits (which `orjson` would decode as floats)
+LARGE_INTEGER = re_compile(rb"[:\[,]\s*-?[0-9]{19}")
+
+# a (much) faster check for runs of digits that might be large integers
+DIGITS = bytes.maketrans(b"123456789", b"000000000")
+DIGIT_RUN = b"0" * 19
+
+
+def default(obj):
+    # load lazy resources on demand
+    if isinstance(obj, LazyResource):
+        return obj.load()
+    raise TypeError("Object of type {} is not JSON serializable".format(obj.__class__.__name__))
+
+
+class StandardJSONCodec:
+    """
+    Encode and decode JSON using the standard library.
+
+    """
+    name = "stdlib"
+
+    def __repr__(self):
+        return "{}()".format(
+            self.__class__.__name__,
+        )
+
+    def loads(self, data):
+        return loads(data)
+
+    def dumps(self, obj, compact=False):
+        # ensure deterministic output order for easier diffs
+        return dumps(
+            obj,
+            sort_keys=True,
+            separators=(",", ":") if compact else None,
+            default=default,
+        )
+
+
+class OrjsonCodec(StandardJSONCodec):
+    """
+    Decode JSON using `orjson`.
+
+    Encoding still uses the standard library: `orjson` formats some values (e.g. floats and non-ASCII
+    text) differently, and output must remain byte-identical across backends.
+
+    """
+    name = "orjson"
+
+    def loads(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if DIGIT_RUN in data.translate(DIGITS) and LARGE_INTEGER.search(data):
+            return super().loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # the standard library accepts a few more inputs (e.g. `NaN` and very large integers)
+            return super().loads(data)
+
+
+def available_codecs():
+    """
+    Return the available codecs, fastest first.
+
+    """
+    codecs = [StandardJSONCodec()]
+    if orjson is not None:
+        codecs.insert(0, OrjsonCodec())
+    return codecs
+
+
+def default_codec():
+    return available_codecs()[0]
@@ -2,19 +2,25 @@
 JSON Formatter
 
 """
-from json import dumps, loads
-
 from microcosm_resourcesync.formatters.base import Formatter
+from microcosm_resourcesync.formatters.json_codecs import default_codec
 
 
 class JSONFormatter(Formatter):
 
+    def __init__(self, codec=None):
+        self.codec = codec or default_codec()
+
     def load(self, data):
-        return loads(data)
+        return self.codec.loads(data)
 
     def dump(self, dct):
         # ensure deterministic output order for easier diffs
-        return dumps(dct, sort_keys=True) + "\n"
+        return self.codec.dumps(dct) + "\n"
+
+    def dump_items(self, items):
+        # equivalent to dumping `dict(items=...)`, without serializing every item again
+        return '{"items": [' + ", ".join(item.rstrip("\n") for item in items) + "]}\n"
 
     @property
     def extension(self):
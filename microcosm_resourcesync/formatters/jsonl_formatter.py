@@ -0,0 +1,38 @@
+"""
+JSON Lines Formatter
+
+"""
+from microcosm_resourcesync.formatters.base import Formatter
+from microcosm_resourcesync.formatters.json_codecs import default_codec
+
+
+class JSONLinesFormatter(Formatter):
+    """
+    Encode each resource as a single (compact) line of JSON.
+
+    """
+    def __init__(self, codec=None):
+        self.codec = codec or default_codec()
+
+    def load(self, data):
+        return self.codec.loads(data)
+
+    def dump(self, dct):
+        # JSON never encodes newlines within a value
+        return self.codec.dumps(dct, compact=True) + "\n"
+
+    def dump_items(self, items):
+        # equivalent to dumping `dict(items=...)`, without serializing every item again
+        return '{"items":[' + ",".join(item.rstrip("\n") for item in items) + "]}\n"
+
+    @property
+    def extension(self):
+        return ".jsonl"
+
+    @property
+    def mime_types(self):
+        return [
+            "application/x-ndjson",
+            "application/jsonl",
+            "application/x-jsonlines",
+        ]
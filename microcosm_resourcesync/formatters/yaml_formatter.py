@@ -5,6 +5,7 @@ YAML Formatter
 from yaml import dump, load
 
 from microcosm_resourcesync.formatters.base import Formatter
+from microcosm_resourcesync.schemas.lazy import LazyResource, as_dict
 
 
 try:
@@ -13,6 +14,38 @@ except ImportError:
     from yaml import SafeDumper, SafeLoader  # type: ignore
 
 
+class ResourceDumper(SafeDumper):
+    """
+    A safe dumper that loads lazy resources on demand.
+
+    """
+    pass
+
+
+ResourceDumper.add_multi_representer(
+    LazyResource,
+    lambda dumper, resource: dumper.represent_dict(resource.load()),
+)
+
+
+def first_content_line(data):
+    """
+    Return the first line of YAML data that is neither blank nor a comment (or "" if there is none).
+
+    """
+    start = 0
+    while start < len(data):
+        end = data.find("\n", start)
+        if end == -1:
+            end = len(data)
+        line = data[start:end]
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#"):
+            return line
+        start = end + 1
+    return ""
+
+
 class YAMLFormatter(Formatter):
 
     def load(self, data):
@@ -20,7 +53,7 @@ class YAMLFormatter(Formatter):
 
     def dump(self, dct):
         return dump(
-            dict(dct),
+            as_dict(dct),
             # show every document in its own block
             default_flow_style=False,
             # start a new document (via "---") before every resource
@@ -28,9 +61,19 @@ class YAMLFormatter(Formatter):
             # follow (modern) PEP8 max line length and indent
             width=99,
             indent=4,
-            Dumper=SafeDumper,
+            Dumper=ResourceDumper,
         )
 
+    def dump_raw(self, data):
+        line = first_content_line(data)
+        # directives would apply to every following document
+        if line.startswith("%"):
+            return None
+        # start a new document before every resource (as when dumping)
+        if not (line.startswith("---") and line[3:4] in ("", " ", "\t", "\r")):
+            data = "---\n" + data
+        return super().dump_raw(data)
+
     @property
     def extension(self):
         return ".yaml"
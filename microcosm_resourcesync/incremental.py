@@ -0,0 +1,69 @@
+"""
+Incremental synchronization support.
+
+"""
+from hashlib import sha256
+from json import dump, load
+from os import replace
+from os.path import exists
+
+from microcosm_resourcesync.formatters import Formatters
+
+
+def content_hash(resource):
+    """
+    Compute a stable hash of a resource's content.
+
+    Uses the JSON formatter because its output is deterministic (keys are sorted). Lazy resources
+    may already know their content hash.
+
+    """
+    known_hash = getattr(resource, "content_hash", None)
+    if known_hash is not None:
+        return known_hash
+
+    return sha256(Formatters.JSON.value.dump(resource).encode("utf-8")).hexdigest()
+
+
+def changed(resources, previous_hashes, current_hashes):
+    """
+    Generate the resources whose content differs from the previous content hashes.
+
+    Records the content hash of every resource in `current_hashes`.
+
+    """
+    for resource in resources:
+        current_hash = current_hashes[resource.uri] = content_hash(resource)
+        if previous_hashes.get(resource.uri) != current_hash:
+            yield resource
+
+
+class Manifest:
+    """
+    The content hashes of the resources written by a previous run.
+
+    """
+    def __init__(self, path, hashes=None):
+        self.path = path
+        self.hashes = hashes or dict()
+
+    def __repr__(self):
+        return "{}('{}')".format(
+            self.__class__.__name__,
+            self.path,
+        )
+
+    @classmethod
+    def load(cls, path):
+        if not exists(path):
+            return cls(path)
+
+        with open(path) as file_:
+            return cls(path, load(file_))
+
+    def save(self):
+        # write atomically so that an interrupted run never leaves a partial manifest
+        temp_path = "{}.tmp".format(self.path)
+        with open(temp_path, "w") as file_:
+            dump(self.hashes, file_, sort_keys=True)
+        replace(temp_path, self.path)
@@ -0,0 +1,102 @@
+"""
+Resource index support.
+
+File-based endpoints maintain a compact sidecar index of the resources they write so that later reads
+can sort and plan using the index alone, loading resource content lazily.
+
+"""
+from collections import namedtuple
+from json import dump, load
+from os import replace
+
+
+# The location is a relative file path (directories) or a byte offset (files) and the size is
+# the number of bytes stored at that location.
+IndexEntry = namedtuple("IndexEntry", [
+    "location",
+    "size",
+    "mtime_ns",
+    "uri",
+    "type",
+    "id",
+    "parents",
+    "content_hash",
+])
+
+
+def identity_of(resource):
+    """
+    Return the identity fields of a resource (in index entry order).
+
+    """
+    return resource.uri, resource.type, resource.id, list(resource.parents)
+
+
+class ResourceIndex:
+    """
+    A sidecar index of the resources stored by a file-based endpoint.
+
+    Indexes are only valid for the schema used to compute their identity fields.
+
+    """
+    VERSION = 1
+
+    def __init__(self, path, schema_cls, entries=None, metadata=None):
+        self.path = path
+        self.schema_name = schema_cls.__name__
+        self.entries = entries or dict()
+        self.metadata = metadata or dict()
+
+    def __repr__(self):
+        return "{}('{}')".format(
+            self.__class__.__name__,
+            self.path,
+        )
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def load(cls, path, schema_cls):
+        """
+        Load an index, returning `None` if there is no usable index.
+
+        """
+        try:
+            with open(path) as file_:
+                data = load(file_)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != cls.VERSION or data.get("schema") != schema_cls.__name__:
+            return None
+
+        entries = (IndexEntry(*values) for values in data["resources"])
+        return cls(
+            path,
+            schema_cls,
+            entries={
+                entry.location: entry
+                for entry in entries
+            },
+            metadata=data.get("metadata"),
+        )
+
+    def add(self, entry):
+        self.entries[entry.location] = entry
+
+    def save(self):
+        # write atomically so that readers never use a partial index
+        temp_path = "{}.tmp".format(self.path)
+        with open(temp_path, "w") as file_:
+            dump(
+                dict(
+                    version=self.VERSION,
+                    schema=self.schema_name,
+                    metadata=self.metadata,
+                    resources=list(self.entries.values()),
+                ),
+                file_,
+                separators=(",", ":"),
+            )
+        replace(temp_path, self.path)
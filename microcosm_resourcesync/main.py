@@ -4,6 +4,8 @@ Command line entry points.
 """
 from click import (
     BadParameter,
+    Choice,
+    IntRange,
     argument,
     command,
     echo,
@@ -12,11 +14,20 @@ from click import (
     prompt,
 )
 
+from microcosm_resourcesync.compression import Compression
 from microcosm_resourcesync.endpoints import endpoint_for
-from microcosm_resourcesync.following import FollowMode
+from microcosm_resourcesync.following import CrawlOrder, FollowMode
 from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.incremental import Manifest, changed
+from microcosm_resourcesync.parallel import read_ahead
 from microcosm_resourcesync.schemas import Schemas
-from microcosm_resourcesync.toposort import toposorted
+from microcosm_resourcesync.schemas.compact import compacted
+from microcosm_resourcesync.spilling import toposorted_external
+from microcosm_resourcesync.toposort import toposorted, toposorted_online
+
+
+# the number of resources read ahead of writes when pipelining
+PIPELINE_SIZE = 1000
 
 
 def validate_endpoint(context, param, value):
@@ -34,55 +45,179 @@ def validate_endpoints(context, param, value):
 
 
 def validate_positive_int(context, param, value):
-    if value < 1:
+    if value is not None and value < 1:
         raise BadParameter("Must be a positive integer")
     return value
 
 
-def sync(context, origins, destination, **kwargs):
+def sync(
+    context,
+    origins,
+    destination,
+    incremental=False,
+    manifest_path=None,
+    stream=False,
+    pipeline=False,
+    external_sort=False,
+    spill_dir=None,
+    compact=False,
+    **kwargs
+):
     """
     Synchronize data from one endpoint to another.
 
+    In streaming mode, resources are written as they are read (without sorting), using bounded memory.
+
+    In pipelined mode, resources are read in the background and each resource is written as soon as
+    all of its parents have been written.
+
+    With an external sort, resource content is spilled to disk while sorting.
+
+    Compact resources are held in memory as serialized bytes (instead of nested dictionaries) until written.
+
     """
     for origin in origins:
         if origin == destination:
             context.fail("origin and destination may not be the same")
 
+    validate_modes(context, stream, pipeline, external_sort, compact)
+
     for origin in origins:
         origin.validate_for_read(**kwargs)
-    destination.validate_for_write(**kwargs)
+    destination.validate_for_write(incremental=incremental, manifest_path=manifest_path, **kwargs)
+
+    if stream:
+        sorted_resources = read_resources(origins, **kwargs)
+    elif pipeline:
+        resources = read_resources(origins, **kwargs)
+        if compact:
+            resources = compacted(resources)
+        sorted_resources = toposorted_online(read_ahead(resources, PIPELINE_SIZE))
+    elif external_sort:
+        echo("Toposorting resources (spilling to disk)", err=True)
+        sorted_resources = toposorted_external(read_resources(origins, **kwargs), kwargs["schema_cls"], spill_dir)
+    else:
+        resources = []
+        for origin in origins:
+            echo("Reading resources from: {}".format(origin), err=True)
+            if compact:
+                resources.extend(compacted(origin.read(**kwargs)))
+            else:
+                resources.extend(origin.read(**kwargs))
+
+        echo("Toposorting {} resources".format(len(resources)), err=True)
+        sorted_resources = list(toposorted(resources))
+
+    if incremental:
+        manifest = Manifest.load(manifest_path) if manifest_path else None
+        previous_hashes = manifest.hashes if manifest else destination.content_hashes(**kwargs)
+        if previous_hashes is None:
+            context.fail("--incremental requires a --manifest for: {}".format(destination))
+
+        current_hashes = dict()
+        if stream or pipeline or external_sort:
+            sorted_resources = changed(sorted_resources, previous_hashes, current_hashes)
+        else:
+            changed_resources = list(changed(sorted_resources, previous_hashes, current_hashes))
+            echo("Skipping {} unchanged resources".format(len(sorted_resources) - len(changed_resources)), err=True)
+            sorted_resources = changed_resources
 
-    resources = []
-    for origin in origins:
-        echo("Reading resources from: {}".format(origin), err=True)
-        resources.extend(origin.read(**kwargs))
+    echo("Writing resources to: {}".format(destination), err=True)
+    destination.write(sorted_resources, stream=stream, **kwargs)
 
-    echo("Toposorting {} resources".format(len(resources)), err=True)
-    sorted_resources = list(toposorted(resources))
+    if incremental and manifest:
+        manifest.hashes.update(current_hashes)
+        manifest.save()
 
-    echo("Writing resources to: {}".format(destination), err=True)
-    destination.write(sorted_resources, **kwargs)
+
+def validate_modes(context, stream, pipeline, external_sort, compact):
+    """
+    Reject combinations of (mutually exclusive) sync modes.
+
+    """
+    modes = [name for name, enabled in (
+        ("--stream", stream),
+        ("--pipeline", pipeline),
+        ("--external-sort", external_sort),
+    ) if enabled]
+    if len(modes) > 1:
+        context.fail("{} may not be combined".format(" and ".join(modes)))
+    if compact and (stream or external_sort):
+        # neither mode holds resource content in memory
+        context.fail("--compact may not be combined with {}".format(modes[0]))
+
+
+def read_resources(origins, **kwargs):
+    """
+    Generate the resources of every origin, in order.
+
+    """
+    for origin in origins:
+        echo("Streaming resources from: {}".format(origin), err=True)
+        yield from origin.read(**kwargs)
 
 
 @command()
 @pass_context
 @option("--json", "-j", "formatter", flag_value=Formatters.JSON.name, help="Use json output")
 @option("--yaml", "-y", "formatter", flag_value=Formatters.YAML.name, help="Use yaml output")
+@option("--jsonl", "formatter", flag_value=Formatters.JSONL.name, help="Use json lines output (and pipe input)")
 @option("--hal", "resource_type", flag_value=Schemas.HAL.name, help="Use HAL JSON schema (default)")
 @option("--simple", "-s", "resource_type", flag_value=Schemas.SIMPLE.name, help="Use Simple JSON schema")
 @option("--rm", "remove", is_flag=True)
+@option("--incremental", "-i", is_flag=True, help="Only write new or changed resources")
+@option("--pipeline", is_flag=True, help="Write resources while reading, as soon as their parents are written")
+@option("--external-sort", is_flag=True, help="Spill resources to disk while sorting (for very large inputs)")
+@option("--spill-dir", help="Spill resources to this directory (default: the system temporary directory)")
+@option("--compact", is_flag=True, help="Hold resources in memory as serialized bytes (for large inputs)")
+@option("--stream", is_flag=True, help="Write resources as they are read (inputs must be sorted or independent)")
+@option("--manifest", "manifest_path", help="Content hashes of previously written resources")
 @option("--username")
 @option("--follow-all", "-a", "follow_mode", flag_value=FollowMode.ALL.name)
 @option("--follow-child", "-c", "follow_mode", flag_value=FollowMode.CHILD.name)
 @option("--follow-page", "-p", "follow_mode", flag_value=FollowMode.PAGE.name)
 @option("--follow-none", "-n", "follow_mode", flag_value=FollowMode.NONE.name)
+@option("--only-type", "only_types", multiple=True, help="Only read resources of this type (SQLite)")
+@option("--uri-prefix", help="Only read resources whose uri has this prefix (SQLite)")
+@option("--crawl-order", type=Choice([crawl_order.name for crawl_order in CrawlOrder]))
 @option("--batch-size", "-b", type=int, default=1, callback=validate_positive_int)
+@option("--max-batch-bytes", type=int, callback=validate_positive_int)
+@option("--adaptive-batching", is_flag=True)
+@option("--target-latency", type=float, default=1.0)
 @option("--limit", "-l", type=int, default=100, callback=validate_positive_int)
+@option("--read-concurrency", type=int, default=1, callback=validate_positive_int)
+@option("--read-workers", type=int, default=1, callback=validate_positive_int)
+@option("--stream-items", is_flag=True, help="Parse embedded resources of HTTP responses incrementally")
+@option("--cache-dir", help="Cache HTTP responses in this directory")
+@option("--cache-size", type=int, default=1024, callback=validate_positive_int, help="Maximum cache size (MB)")
 @option("--max-attempts", "-m", type=int, default=1, callback=validate_positive_int)
+@option("--backoff", type=float, default=0.5, help="Initial delay (in seconds) between attempts")
+@option("--rate-limit", type=float, help="Maximum (or initial, if adaptive) writes per second")
+@option("--max-in-flight", type=int, callback=validate_positive_int, help="Maximum concurrent writes")
+@option("--adaptive-rate", is_flag=True, help="Adapt the write rate to server throttling")
+@option("--write-concurrency", type=int, default=1, callback=validate_positive_int)
+@option("--write-workers", type=int, default=1, callback=validate_positive_int)
+@option("--compress", type=Choice([compression.name for compression in Compression]),
+        help="Compress directory files and pipe output")
+@option("--compress-threads", type=int, default=1, callback=validate_positive_int,
+        help="Use a multi-threaded (de)compressor for large files, when installed")
+@option("--shard-depth", type=IntRange(1, 4), help="Shard directory exports into nested sub-directories")
+@option("--shard-width", type=IntRange(1, 4), default=2, help="Hex digits per shard (fan-out of 16^N)")
 @option("--verbose", "-v", is_flag=True)
 @argument("origin", callback=validate_endpoints, nargs=-1)
 @argument("destination", callback=validate_endpoint, nargs=1)
-def main(context, origin, destination, formatter, resource_type, follow_mode, username, **kwargs):
+def main(
+    context,
+    origin,
+    destination,
+    formatter,
+    resource_type,
+    follow_mode,
+    crawl_order,
+    compress,
+    username,
+    **kwargs
+):
     """
     Synchronized resources from origin endpoint to destination endpoint.
 
@@ -91,12 +226,16 @@ def main(context, origin, destination, formatter, resource_type, follow_mode, us
     formatter = Formatters[formatter or destination.default_formatter]
     schema_cls = Schemas[resource_type or Schemas.HAL.name].value
     follow_mode = FollowMode[follow_mode or FollowMode.PAGE.name]
+    crawl_order = CrawlOrder[crawl_order or CrawlOrder.PAGE_FIRST.name]
+    compression = Compression[compress] if compress else None
 
     sync(
         context=context,
         origins=origin,
         destination=destination,
         follow_mode=follow_mode,
+        crawl_order=crawl_order,
+        compression=compression,
         formatter=formatter,
         schema_cls=schema_cls,
         auth=auth,
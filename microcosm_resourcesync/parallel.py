@@ -0,0 +1,83 @@
+"""
+Parallel processing support.
+
+"""
+from collections import deque
+from itertools import islice
+from queue import Empty, Queue
+from threading import Event, Thread
+
+
+def chunked(iterable, chunk_size):
+    """
+    Chunk an iterable into lists of (at most) `chunk_size` items.
+
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def imap_bounded(executor, func, iterable, max_pending):
+    """
+    Map `func` over an iterable using an executor, generating results in input order.
+
+    At most `max_pending` calls are submitted ahead of the results that have been consumed, which
+    bounds memory usage for large (or lazy) inputs.
+
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
+
+def read_ahead(iterable, max_size):
+    """
+    Consume an iterable in a background thread, generating its items via a bounded queue.
+
+    Overlaps producing items (e.g. reading) with consuming them (e.g. writing) while holding at most
+    `max_size` items in memory. Errors are re-raised in the consuming thread.
+
+    """
+    queue = Queue(maxsize=max_size)
+    stopped = Event()
+
+    def produce():
+        try:
+            for item in iterable:
+                queue.put((True, item))
+                if stopped.is_set():
+                    return
+        except BaseException as error:
+            queue.put((False, error))
+        else:
+            queue.put((False, None))
+
+    thread = Thread(target=produce, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            ok, value = queue.get()
+            if ok:
+                yield value
+            elif value is None:
+                return
+            else:
+                raise value
+    finally:
+        # unblock the producer if the consumer stops early
+        stopped.set()
+        while thread.is_alive():
+            try:
+                queue.get(timeout=0.1)
+            except Empty:
+                pass
@@ -0,0 +1,114 @@
+"""
+Rate limiting support.
+
+"""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from random import uniform
+from threading import BoundedSemaphore, Lock
+from time import monotonic, sleep
+
+
+# status codes that indicate a transient failure (and that a request may be retried)
+RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+
+# status codes that indicate that the server wants clients to slow down
+THROTTLED_STATUS_CODES = (429, 503)
+
+
+class RateLimiter:
+    """
+    Limit the rate (using a token bucket) and concurrency of requests.
+
+    If adaptive, the rate increases additively while requests succeed and halves whenever the server
+    throttles a request, so that it converges to the highest sustainable throughput.
+
+    Safe to share between concurrent writers.
+
+    """
+    def __init__(self, rate=None, max_in_flight=None, adaptive=False, min_rate=0.1, clock=monotonic, sleep=sleep):
+        self.rate = rate
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self.clock = clock
+        self.sleep = sleep
+        self.semaphore = BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self.lock = Lock()
+        self.tokens = 1.0
+        self.updated = clock()
+
+    def __repr__(self):
+        return "{}({})".format(
+            self.__class__.__name__,
+            self.rate,
+        )
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def acquire(self):
+        """
+        Wait until a request may be sent.
+
+        """
+        if self.semaphore is not None:
+            self.semaphore.acquire()
+
+        while self.rate is not None:
+            with self.lock:
+                now = self.clock()
+                # allow bursts of up to one second's worth of requests
+                self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                delay = (1.0 - self.tokens) / self.rate
+            self.sleep(delay)
+
+    def release(self):
+        if self.semaphore is not None:
+            self.semaphore.release()
+
+    def record_success(self):
+        if not self.adaptive or self.rate is None:
+            return
+        with self.lock:
+            # increase by (about) one request per second, every second
+            self.rate += 1.0 / self.rate
+
+    def record_throttled(self):
+        if not self.adaptive or self.rate is None:
+            return
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+
+def backoff_delay(attempt, backoff=0.5, max_backoff=60.0, retry_after=None):
+    """
+    Compute the delay before retrying a request.
+
+    Honors the server's `Retry-After` header (either in seconds or as an HTTP date); otherwise uses
+    exponential backoff with (full) jitter.
+
+    """
+    if retry_after:
+        try:
+            return min(max_backoff, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            pass
+        else:
+            # dates in an unknown (`-0000`) zone are parsed as naive datetimes
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            return min(max_backoff, max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds()))
+
+    return uniform(0, min(max_backoff, backoff * 2 ** attempt))
@@ -5,6 +5,7 @@ Schema modeling.
 from enum import Enum, unique
 
 from microcosm_resourcesync.schemas.hal_schema import HALSchema
+from microcosm_resourcesync.schemas.lazy import LazyResource, as_dict  # noqa: F401
 from microcosm_resourcesync.schemas.simple_schema import SimpleSchema
 
 
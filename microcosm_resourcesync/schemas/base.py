@@ -8,13 +8,102 @@ from collections import namedtuple
 
 Link = namedtuple("Link", ["relation", "uri"])
 
+# The serialized data that a resource was loaded from, along with the extension of its format.
+Raw = namedtuple("Raw", ["extension", "data"])
+
+
+class cached_property:
+    """
+    A property that is computed once per resource (until the resource is modified).
+
+    The value is stored in the instance's `__dict__` (which schemas otherwise only use for `raw` data)
+    under the property's own name, so later lookups find it without calling any Python code.
+
+    """
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.func(instance)
+        return value
+
 
 class Schema(dict, metaclass=ABCMeta):
     """
     A schema wraps a dictionary and defines a `uri`, `id`, `type`, etc.
 
+    Derived fields may be cached (see `cached_property`); any change to the dictionary discards them,
+    along with any `raw` data.
+
     """
-    @property
+    # the attribute that contains embedded resources
+    embedded_key = None
+
+    # the data the resource was loaded from (if kept), which may be written as is
+    raw = None
+
+    def with_raw(self, raw):
+        """
+        Keep the data the resource was loaded from.
+
+        """
+        if raw is not None:
+            self.raw = raw
+        return self
+
+    def invalidate(self):
+        """
+        Discard cached identity fields (and raw data).
+
+        Modifying the dictionary itself does this automatically; modifying a nested value
+        (e.g. a link) in place does not.
+
+        """
+        self.__dict__.clear()
+
+    def __getstate__(self):
+        # cached fields are cheap to recompute; don't send them to other processes
+        if "raw" in self.__dict__:
+            return dict(raw=self.raw)
+        return None
+
+    def __setitem__(self, key, value):
+        self.__dict__.clear()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.__dict__.clear()
+        super().__delitem__(key)
+
+    def __ior__(self, other):
+        self.__dict__.clear()
+        return super().__ior__(other)
+
+    def clear(self):
+        self.__dict__.clear()
+        super().clear()
+
+    def pop(self, *args):
+        self.__dict__.clear()
+        return super().pop(*args)
+
+    def popitem(self):
+        self.__dict__.clear()
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self.__dict__.clear()
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self.__dict__.clear()
+        super().update(*args, **kwargs)
+
+    @cached_property
     def id(self):
         """
         The dictionary is assumed to have an "id" attribute.
@@ -0,0 +1,62 @@
+"""
+Compactly stored resources.
+
+"""
+from sys import intern
+
+from microcosm_resourcesync.formatters.json_codecs import default_codec
+from microcosm_resourcesync.schemas.lazy import LazyResource
+
+
+# resources without parents share a single (empty) tuple
+NO_PARENTS = ()
+
+CODEC = default_codec()
+
+
+class CompactResource(LazyResource):
+    """
+    A resource that keeps its identity in slots and its content as (compact) serialized JSON.
+
+    A compact resource uses a small fraction of the memory of the equivalent nested dictionaries;
+    its content is decoded on demand (and not retained) whenever it is loaded.
+
+    """
+    __slots__ = ("payload",)
+
+    def __init__(self, uri, type, id, parents, payload, content_hash=None):
+        super().__init__(uri, type, id, parents, None, content_hash)
+        self.payload = payload
+
+    def load(self):
+        return CODEC.loads(self.payload)
+
+    @classmethod
+    def from_resource(cls, resource):
+        """
+        Compact a (fully loaded) resource.
+
+        """
+        return cls(
+            resource.uri,
+            # many resources share the same type
+            intern(resource.type),
+            resource.id,
+            tuple(resource.parents) or NO_PARENTS,
+            CODEC.dumps(resource, compact=True).encode("utf-8"),
+            getattr(resource, "content_hash", None),
+        )
+
+
+def compacted(resources):
+    """
+    Generate compact versions of resources.
+
+    Lazy resources are already compact (their content has not been loaded) and are passed through.
+
+    """
+    for resource in resources:
+        if isinstance(resource, LazyResource):
+            yield resource
+        else:
+            yield CompactResource.from_resource(resource)
@@ -3,31 +3,47 @@ A schema using HAL JSON linking conventions.
 
 """
 from microcosm_resourcesync.following import FollowMode
-from microcosm_resourcesync.schemas.base import Link, Schema
+from microcosm_resourcesync.schemas.base import Link, Schema, cached_property
 
 
 class HALSchema(Schema):
     """
     A schema that implements HAL JSON linking.
 
+    Identity fields and links are derived by walking `_links`, so they are cached.
+
     """
+    embedded_key = "items"
+
     @property
     def embedded(self):
-        return self.get("items", [])
+        return self.get(self.embedded_key, [])
 
     def links(self, follow_mode):
+        cache = self.__dict__.setdefault("_links_by_mode", dict())
+        try:
+            return cache[follow_mode]
+        except KeyError:
+            links = cache[follow_mode] = [
+                link
+                for link in self.all_links
+                if self.should_follow(link.relation, link.uri, follow_mode)
+            ]
+            return links
+
+    @cached_property
+    def all_links(self):
         return [
             Link(relation, uri)
             for relation, uri in self.iter_links()
-            if self.should_follow(relation, uri, follow_mode)
         ]
 
-    @property
+    @cached_property
     def parents(self):
         return [
-            uri
-            for relation, uri in self.iter_links()
-            if relation.startswith("parent:")
+            link.uri
+            for link in self.all_links
+            if link.relation.startswith("parent:")
         ]
 
     def should_follow(self, relation, uri, follow_mode):
@@ -55,7 +71,7 @@ class HALSchema(Schema):
 
         return False
 
-    @property
+    @cached_property
     def type(self):
         """
         We assume that the URI is of the form: `https://example.com/path/to/<type>/<id>`
@@ -63,7 +79,7 @@ class HALSchema(Schema):
         """
         return self.uri.split("/")[-2]
 
-    @property
+    @cached_property
     def uri(self):
         """
         We assume that the resource has a valid HAL self link.
@@ -0,0 +1,69 @@
+"""
+Lazily loaded resources.
+
+"""
+from collections.abc import Mapping
+
+
+class LazyResource(Mapping):
+    """
+    A resource whose identity (`uri`, `type`, `id`, and `parents`) is known up front and whose
+    content is only loaded on demand.
+
+    Lazy resources support everything needed to sort and plan writes without loading their content;
+    formatters load the content (once per resource) when writing. If the data that the content is loaded
+    from can be written as is, a `raw_loader` may return it (without loading the content).
+
+    """
+    __slots__ = ("uri", "type", "id", "parents", "loader", "content_hash", "raw_loader")
+
+    def __init__(self, uri, type, id, parents, loader, content_hash=None, raw_loader=None):
+        self.uri = uri
+        self.type = type
+        self.id = id
+        self.parents = parents
+        self.loader = loader
+        self.content_hash = content_hash
+        self.raw_loader = raw_loader
+
+    def __repr__(self):
+        return "{}('{}')".format(
+            self.__class__.__name__,
+            self.uri,
+        )
+
+    def __getitem__(self, key):
+        return self.load()[key]
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __len__(self):
+        return len(self.load())
+
+    def load(self):
+        """
+        Load the content of the resource as a dictionary.
+
+        """
+        return self.loader()
+
+    @property
+    def raw(self):
+        """
+        Load the data the content is loaded from (as `Raw` data), if known.
+
+        """
+        if self.raw_loader is None:
+            return None
+        return self.raw_loader()
+
+
+def as_dict(resource):
+    """
+    Convert a (possibly lazy) resource to a plain dictionary.
+
+    """
+    if isinstance(resource, LazyResource):
+        return resource.load()
+    return dict(resource)
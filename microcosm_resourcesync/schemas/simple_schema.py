@@ -11,9 +11,11 @@ class SimpleSchema(Schema):
     A schema that encodes uri/type verbatim in its dictionary.
 
     """
+    embedded_key = "embedded"
+
     @property
     def embedded(self):
-        return self.get("embedded", [])
+        return self.get(self.embedded_key, [])
 
     def links(self, follow_mode):
         if follow_mode == FollowMode.NONE:
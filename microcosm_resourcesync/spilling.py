@@ -0,0 +1,64 @@
+"""
+External-memory (spill to disk) support.
+
+"""
+from collections import namedtuple
+from hashlib import blake2b
+from pickle import HIGHEST_PROTOCOL, dumps, loads
+from tempfile import TemporaryFile
+
+from microcosm_resourcesync.schemas import as_dict
+from microcosm_resourcesync.toposort import toposorted
+
+
+# A compact stand-in for a resource: its URI (and its parents' URIs) are replaced by fixed-size
+# digests and its content is stored on disk at `offset`.
+SpilledResource = namedtuple("SpilledResource", [
+    "type",
+    "id",
+    "uri",
+    "parents",
+    "offset",
+    "size",
+])
+
+
+def digest(uri):
+    return blake2b(uri.encode("utf-8"), digest_size=16).digest()
+
+
+def spill(resources, file_):
+    """
+    Write the content of resources to a file, generating compact stand-ins.
+
+    """
+    offset = 0
+    for resource in resources:
+        data = dumps(as_dict(resource), HIGHEST_PROTOCOL)
+        file_.write(data)
+        yield SpilledResource(
+            resource.type,
+            resource.id,
+            digest(resource.uri),
+            tuple(digest(parent) for parent in resource.parents),
+            offset,
+            len(data),
+        )
+        offset += len(data)
+
+
+def toposorted_external(resources, schema_cls, spill_dir=None):
+    """
+    Perform a topological sort on resources that may not fit in memory.
+
+    Resource content is spilled to a temporary file and only compact stand-ins are sorted (in the same,
+    deterministic order as `toposorted`); resources are then streamed back from disk in sorted order.
+
+    """
+    with TemporaryFile(prefix="resourcesync-", dir=spill_dir) as file_:
+        spilled = toposorted(spill(resources, file_))
+        file_.flush()
+
+        for resource in spilled:
+            file_.seek(resource.offset)
+            yield schema_cls(loads(file_.read(resource.size)))
@@ -0,0 +1,188 @@
+"""
+Multi-document file splitting support.
+
+Large multi-document YAML (and JSON Lines) files are split at top-level document boundaries so that
+the documents may be parsed in parallel (and in order).
+
+"""
+from mmap import ACCESS_READ, mmap
+from os.path import getsize
+
+from yaml import load, load_all
+
+from microcosm_resourcesync.formatters.json_codecs import default_codec
+from microcosm_resourcesync.formatters.yaml_formatter import SafeLoader
+
+
+# the (approximate) number of bytes parsed by a worker at a time
+SPLIT_CHUNK_SIZE = 4 * 1024 * 1024
+
+# the characters that may follow a document start marker
+MARKER_TERMINATORS = b" \t\r\n"
+
+
+def load_documents(stream):
+    """
+    Load all documents from a stream (or string) using the fastest available (safe) loader.
+
+    """
+    return load_all(stream, Loader=SafeLoader)
+
+
+def is_marker(line, marker):
+    """
+    Whether a line is a top-level document marker (e.g. `---` or `...`).
+
+    """
+    return line.startswith(marker) and line[3:4] in ("", " ", "\t", "\r", "\n")
+
+
+def split_documents(lines):
+    """
+    Generate the text of each YAML document from an iterable of lines.
+
+    Documents are split at top-level document start (`---`) and end (`...`) markers; directives (e.g.
+    `%YAML`) stay with the document that follows them.
+
+    """
+    document, directives = [], False
+    for line in lines:
+        if line.startswith("%"):
+            if document and not directives:
+                yield "".join(document)
+                document = []
+            directives = True
+        elif is_marker(line, "---"):
+            if document and not directives:
+                yield "".join(document)
+                document = []
+            directives = False
+
+        document.append(line)
+
+        if is_marker(line, "..."):
+            yield "".join(document)
+            document, directives = [], False
+
+    if document:
+        yield "".join(document)
+
+
+def load_raw_documents(lines):
+    """
+    Load all YAML documents from an iterable of lines, along with the text of each document.
+
+    """
+    for text in split_documents(lines):
+        document = load(text, Loader=SafeLoader)
+        if document is not None:
+            yield document, text
+
+
+def load_range(path, byte_range):
+    """
+    Load all documents from a `(start, end)` byte range of a file.
+
+    """
+    start, end = byte_range
+    with open(path, "rb") as file_:
+        file_.seek(start)
+        return list(load_documents(file_.read(end - start)))
+
+
+def load_lines(lines):
+    """
+    Load all (non-blank) JSON Lines documents from an iterable of lines.
+
+    """
+    codec = default_codec()
+    for line in lines:
+        if line.strip():
+            yield codec.loads(line)
+
+
+def load_raw_lines(lines):
+    """
+    Load all (non-blank) JSON Lines documents from an iterable of lines, along with each line.
+
+    """
+    codec = default_codec()
+    for line in lines:
+        if line.strip():
+            yield codec.loads(line), line
+
+
+def load_line_range(path, byte_range):
+    """
+    Load all JSON Lines documents from a `(start, end)` byte range of a file.
+
+    """
+    start, end = byte_range
+    with open(path, "rb") as file_:
+        file_.seek(start)
+        return list(load_lines(file_.read(end - start).splitlines()))
+
+
+def is_splittable(data):
+    """
+    Documents can be split only if no directives (e.g. `%YAML`) apply to them.
+
+    """
+    return data[:1] != b"%" and data.find(b"\n%") == -1
+
+
+def find_boundary(data, start):
+    """
+    Find the offset of the next top-level document start marker (`---`) at or after `start`.
+
+    Markers must start a line and end with whitespace (or the end of the data); indented lines (e.g.
+    within block scalars) are never boundaries.
+
+    """
+    while True:
+        index = data.find(b"\n---", start - 1 if start else 0)
+        if index == -1:
+            return -1
+        end = index + 4
+        if end == len(data) or data[end:end + 1] in MARKER_TERMINATORS:
+            return index + 1
+        start = end
+
+
+def find_line_boundary(data, start):
+    """
+    Find the offset of the next line at or after `start`.
+
+    """
+    if not start:
+        return 0
+    index = data.find(b"\n", start - 1)
+    return index + 1 if index != -1 else -1
+
+
+def split_ranges(data, chunk_size=SPLIT_CHUNK_SIZE, find_boundary=find_boundary):
+    """
+    Generate `(start, end)` byte ranges that each contain one or more complete documents.
+
+    """
+    start, size = 0, len(data)
+    while start < size:
+        end = find_boundary(data, start + chunk_size)
+        if end == -1:
+            end = size
+        yield start, end
+        start = end
+
+
+def iter_ranges(path, chunk_size=SPLIT_CHUNK_SIZE, find_boundary=find_boundary, is_splittable=is_splittable):
+    """
+    Compute the byte ranges of a file to parse in parallel, or `None` if the file cannot be split.
+
+    """
+    if not getsize(path):
+        return []
+
+    with open(path, "rb") as file_, mmap(file_.fileno(), 0, access=ACCESS_READ) as data:
+        if not is_splittable(data):
+            return None
+        return list(split_ranges(data, chunk_size, find_boundary))
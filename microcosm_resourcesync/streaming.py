@@ -0,0 +1,130 @@
+"""
+Streaming (incremental) parsing support.
+
+"""
+from codecs import getincrementaldecoder
+from json import JSONDecodeError, JSONDecoder
+
+
+WHITESPACE = " \t\n\r"
+
+
+class JSONStreamReader:
+    """
+    Decode JSON values one at a time from an iterable of byte chunks.
+
+    Only the unparsed remainder of the input is buffered.
+
+    """
+    def __init__(self, chunks, encoding="utf-8"):
+        self.chunks = iter(chunks)
+        self.decoder = JSONDecoder()
+        self.text_decoder = getincrementaldecoder(encoding)()
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self, size=1):
+        """
+        Read chunks until at least `size` unparsed characters are buffered.
+
+        Returns false if the input is exhausted.
+
+        """
+        # drop the parsed prefix of the buffer
+        parts = [self.buffer[self.pos:]]
+        length = len(parts[0])
+        self.pos = 0
+
+        while length < size and not self.exhausted:
+            try:
+                chunk = next(self.chunks)
+            except StopIteration:
+                self.exhausted = True
+                chunk = b""
+            text = self.text_decoder.decode(chunk, final=self.exhausted)
+            parts.append(text)
+            length += len(text)
+
+        self.buffer = "".join(parts)
+        return length >= size
+
+    def peek(self):
+        """
+        Return the next non-whitespace character (without consuming it).
+
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, *chars):
+        """
+        Consume the next non-whitespace character, which must be one of `chars`.
+
+        """
+        char = self.peek()
+        if char not in chars:
+            raise ValueError("Expected one of {} at: {}".format(chars, self.buffer[self.pos:self.pos + 20]))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """
+        Consume the next JSON value.
+
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except JSONDecodeError:
+                if self.exhausted:
+                    raise
+                # the value is incomplete; read (geometrically) more input and try again
+                self.fill(2 * (len(self.buffer) - self.pos) + 1)
+                continue
+
+            if end == len(self.buffer) and not self.exhausted:
+                # a number may continue in the next chunk
+                self.fill(len(self.buffer) - self.pos + 1)
+                continue
+
+            self.pos = end
+            return value
+
+
+def iter_json_items(chunks, envelope, key="items"):
+    """
+    Incrementally parse a JSON object, generating the elements of its `key` array as they are parsed.
+
+    All other attributes of the object are added to `envelope`.
+
+    """
+    reader = JSONStreamReader(chunks)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+
+    while True:
+        name = reader.value()
+        reader.expect(":")
+
+        if name == key and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.expect(",", "]") == "]":
+                        break
+        else:
+            envelope[name] = reader.value()
+
+        if reader.expect(",", "}") == "}":
+            return
@@ -0,0 +1,51 @@
+"""
+Benchmark helpers.
+
+Benchmarks are slow, so they only run if the `RUN_BENCHMARKS` environment variable is set; their
+timings are logged (e.g. `RUN_BENCHMARKS=1 nosetests --nologcapture`).
+
+"""
+from functools import wraps
+from gc import disable, enable, isenabled
+from logging import getLogger
+from os import environ
+from timeit import default_timer
+from unittest import SkipTest
+
+
+logger = getLogger(__name__)
+
+
+def benchmark(func):
+    """
+    Mark a test as a benchmark, skipping it unless benchmarks are enabled.
+
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not environ.get("RUN_BENCHMARKS"):
+            raise SkipTest("RUN_BENCHMARKS is not set")
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def best_of(func, *args, repeat=3, **kwargs):
+    """
+    Return the best wall clock time (in seconds) of several calls.
+
+    As with `timeit`, garbage collection is disabled while timing; otherwise, collections triggered by
+    (large) benchmarks dominate their timings.
+
+    """
+    timings = []
+    gc_enabled = isenabled()
+    disable()
+    try:
+        for _ in range(repeat):
+            start = default_timer()
+            func(*args, **kwargs)
+            timings.append(default_timer() - start)
+    finally:
+        if gc_enabled:
+            enable()
+    return min(timings)
@@ -0,0 +1,30 @@
+"""
+Endpoint test helpers.
+
+"""
+from tempfile import TemporaryDirectory
+
+from microcosm_resourcesync.schemas import SimpleSchema
+
+
+def simple_resource(type_, id_, parents=None):
+    resource = SimpleSchema(
+        id=id_,
+        type=type_,
+        uri="http://example.com/{}/{}".format(type_, id_),
+    )
+    if parents is not None:
+        resource["parents"] = list(parents)
+    return resource
+
+
+class TemporaryDirectoryTest:
+    """
+    Run each test with a (new) temporary directory.
+
+    """
+    def setup(self):
+        self.directory = TemporaryDirectory()
+
+    def teardown(self):
+        self.directory.cleanup()
@@ -0,0 +1,64 @@
+"""
+Archive Endpoint tests
+
+"""
+from os.path import join
+from tarfile import open as open_tar
+from zipfile import ZipFile
+
+from hamcrest import (
+    assert_that,
+    contains,
+    equal_to,
+    is_,
+)
+
+from microcosm_resourcesync.endpoints import ArchiveEndpoint, endpoint_for
+from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.schemas import SimpleSchema
+from microcosm_resourcesync.tests.endpoints.helpers import TemporaryDirectoryTest, simple_resource
+
+
+class TestArchiveEndpoint(TemporaryDirectoryTest):
+
+    def setup(self):
+        super().setup()
+        self.resources = [
+            simple_resource(type_, "{:03}".format(index))
+            for type_ in ("bar", "foo")
+            for index in range(5)
+        ]
+
+    def test_endpoint_for(self):
+        for name in ("export.tar", "export.tar.gz", "export.tgz", "export.tar.xz", "export.zip"):
+            path = join(self.directory.name, name)
+            assert_that(endpoint_for(path), is_(equal_to(ArchiveEndpoint(path))))
+
+    def test_write_and_read_tar(self):
+        endpoint = ArchiveEndpoint(join(self.directory.name, "export.tar.gz"))
+        endpoint.validate_for_write(formatter=Formatters.YAML)
+        endpoint.write(self.resources, formatter=Formatters.YAML)
+
+        with open_tar(endpoint.path) as archive:
+            assert_that(archive.getnames()[0], is_(equal_to("bar/000.yaml")))
+
+        assert_that(
+            list(endpoint.read(schema_cls=SimpleSchema)),
+            contains(*self.resources),
+        )
+        assert_that(
+            list(endpoint.read(schema_cls=SimpleSchema, read_workers=2)),
+            contains(*self.resources),
+        )
+
+    def test_write_and_read_zip(self):
+        endpoint = ArchiveEndpoint(join(self.directory.name, "export.zip"))
+        endpoint.write(self.resources, formatter=Formatters.JSON)
+
+        with ZipFile(endpoint.path) as archive:
+            assert_that(archive.namelist()[-1], is_(equal_to("foo/004.json")))
+
+        assert_that(
+            list(endpoint.read(schema_cls=SimpleSchema)),
+            contains(*self.resources),
+        )
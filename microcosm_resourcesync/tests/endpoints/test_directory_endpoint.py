@@ -0,0 +1,193 @@
+"""
+Directory Endpoint tests
+
+"""
+from os import listdir
+from os.path import exists, join
+
+from click import ClickException
+from hamcrest import (
+    assert_that,
+    calling,
+    contains,
+    equal_to,
+    has_length,
+    instance_of,
+    is_,
+    none,
+    raises,
+)
+
+from microcosm_resourcesync.compression import Compression
+from microcosm_resourcesync.endpoints import DirectoryEndpoint
+from microcosm_resourcesync.endpoints.directory_endpoint import DirectoryLayout
+from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.incremental import content_hash
+from microcosm_resourcesync.indexing import ResourceIndex
+from microcosm_resourcesync.schemas import LazyResource, SimpleSchema
+from microcosm_resourcesync.tests.endpoints.helpers import TemporaryDirectoryTest, simple_resource
+
+
+class TestDirectoryEndpoint(TemporaryDirectoryTest):
+
+    def setup(self):
+        super().setup()
+        self.endpoint = DirectoryEndpoint(self.directory.name)
+        self.resources = [
+            simple_resource(type_, "{:03}".format(index))
+            for type_ in ("bar", "foo")
+            for index in range(20)
+        ]
+
+    def test_write_and_read(self):
+        self.endpoint.write(self.resources, formatter=Formatters.YAML)
+
+        assert_that(
+            list(self.endpoint.read(schema_cls=SimpleSchema)),
+            contains(*self.resources),
+        )
+
+    def test_read_workers(self):
+        self.endpoint.write(self.resources[:20], formatter=Formatters.YAML)
+        self.endpoint.write(self.resources[20:], formatter=Formatters.JSON)
+        with open(join(self.directory.name, ".ignored"), "w") as file_:
+            file_.write("not a resource")
+
+        assert_that(
+            list(self.endpoint.read(schema_cls=SimpleSchema, read_workers=2)),
+            is_(equal_to(list(self.endpoint.read(schema_cls=SimpleSchema)))),
+        )
+        assert_that(
+            list(self.endpoint.read(schema_cls=SimpleSchema, read_workers=2)),
+            contains(*self.resources),
+        )
+
+    def test_write_raw(self):
+        source = DirectoryEndpoint(join(self.directory.name, "source"))
+        source.mkdir(join(source.path, "foo"))
+        data = "# hand-written\nid: '001'\ntype: foo\nuri: http://example.com/foo/001\n"
+        with open(join(source.path, "foo", "001.yaml"), "w") as file_:
+            file_.write(data)
+
+        # resources are written as they were read (when using the same format)
+        destination = DirectoryEndpoint(join(self.directory.name, "destination"))
+        for write_workers in (1, 2):
+            resources = source.read(schema_cls=SimpleSchema, formatter=Formatters.YAML)
+            destination.write(
+                resources,
+                formatter=Formatters.YAML,
+                write_workers=write_workers,
+                schema_cls=SimpleSchema,
+            )
+            with open(join(destination.path, "foo", "001.yaml")) as file_:
+                assert_that(file_.read(), is_(equal_to("---\n" + data)))
+            # without dumping the resource (to compute its content hash)
+            index = ResourceIndex.load(destination.index_path, SimpleSchema)
+            assert_that(index.entries[join("foo", "001.yaml")].content_hash, is_(none()))
+            assert_that(
+                destination.content_hashes(schema_cls=SimpleSchema),
+                is_(equal_to({"http://example.com/foo/001": content_hash(simple_resource("foo", "001"))})),
+            )
+
+            # including lazily loaded resources
+            source = destination
+            destination = DirectoryEndpoint(join(self.directory.name, "destination{}".format(write_workers)))
+
+        resources = list(source.read(schema_cls=SimpleSchema, formatter=Formatters.JSON))
+        assert_that(resources, contains(simple_resource("foo", "001")))
+        assert_that(resources[0].raw, is_(none()))
+
+    def test_write_raw_leading_comment(self):
+        source = DirectoryEndpoint(join(self.directory.name, "source"))
+        source.mkdir(join(source.path, "foo"))
+        data = "# note\n---\nid: '001'\ntype: foo\nuri: http://example.com/foo/001\n"
+        with open(join(source.path, "foo", "001.yaml"), "w") as file_:
+            file_.write(data)
+
+        destination = DirectoryEndpoint(join(self.directory.name, "destination"))
+        destination.write(
+            source.read(schema_cls=SimpleSchema, formatter=Formatters.YAML),
+            formatter=Formatters.YAML,
+        )
+        with open(join(destination.path, "foo", "001.yaml")) as file_:
+            assert_that(file_.read(), is_(equal_to(data)))
+        assert_that(list(destination.read(schema_cls=SimpleSchema)), contains(simple_resource("foo", "001")))
+
+    def test_write_workers(self):
+        self.endpoint.write(self.resources, formatter=Formatters.JSON, write_workers=2)
+
+        assert_that(
+            list(self.endpoint.read(schema_cls=SimpleSchema)),
+            contains(*self.resources),
+        )
+        # no temporary files are left behind
+        assert_that(listdir(join(self.directory.name, "foo")), has_length(20))
+
+    def test_read_indexed(self):
+        self.endpoint.write(self.resources, formatter=Formatters.YAML, schema_cls=SimpleSchema)
+
+        resources = list(self.endpoint.read(schema_cls=SimpleSchema))
+        assert_that(resources, contains(*[instance_of(LazyResource)] * 40))
+        assert_that(resources, contains(*self.resources))
+        assert_that(
+            [content_hash(resource) for resource in resources],
+            contains(*[content_hash(resource) for resource in self.resources]),
+        )
+
+    def test_read_stale_index(self):
+        self.endpoint.write(self.resources, formatter=Formatters.YAML, schema_cls=SimpleSchema)
+
+        # modify one file behind the index's back
+        changed = simple_resource("bar", "000")
+        changed["extra"] = "value"
+        with open(join(self.directory.name, "bar", "000.yaml"), "w") as file_:
+            file_.write(Formatters.YAML.value.dump(changed))
+
+        resources = list(self.endpoint.read(schema_cls=SimpleSchema))
+        assert_that(resources, has_length(40))
+        # unchanged files are still read lazily (and first); the changed file is parsed
+        assert_that(resources[:-1], contains(*[instance_of(LazyResource)] * 39))
+        assert_that(resources[-1], is_(equal_to(changed)))
+        assert_that(resources[-1], instance_of(SimpleSchema))
+
+    def test_write_sharded(self):
+        self.endpoint.validate_for_write(formatter=Formatters.YAML, shard_depth=2, shard_width=1)
+        self.endpoint.write(self.resources, formatter=Formatters.YAML, shard_depth=2, shard_width=1)
+
+        location = DirectoryLayout(2, 1).location_for("foo", "000", ".yaml")
+        assert_that(location, is_(equal_to(join("foo", "2", "a", "000.yaml"))))
+        assert_that(exists(join(self.directory.name, location)), is_(equal_to(True)))
+        assert_that(
+            DirectoryLayout.load(join(self.directory.name, ".layout.json")),
+            is_(equal_to(DirectoryLayout(2, 1))),
+        )
+
+        # later writes keep the recorded layout
+        self.endpoint.write([simple_resource("foo", "020")], formatter=Formatters.YAML)
+
+        resources = sorted(self.endpoint.read(schema_cls=SimpleSchema), key=lambda resource: resource.uri)
+        assert_that(resources, contains(*self.resources, simple_resource("foo", "020")))
+
+    def test_write_sharded_over_flat(self):
+        self.endpoint.write(self.resources, formatter=Formatters.YAML)
+
+        assert_that(
+            calling(self.endpoint.validate_for_write).with_args(formatter=Formatters.YAML, shard_depth=2),
+            raises(ClickException),
+        )
+
+    def test_write_compressed(self):
+        self.endpoint.write(self.resources[:20], formatter=Formatters.YAML, compression=Compression.GZIP)
+        self.endpoint.write(
+            self.resources[20:],
+            formatter=Formatters.JSON,
+            compression=Compression.XZ,
+            write_workers=2,
+        )
+
+        assert_that(exists(join(self.directory.name, "bar", "000.yaml.gz")), is_(equal_to(True)))
+        assert_that(exists(join(self.directory.name, "foo", "000.json.xz")), is_(equal_to(True)))
+        assert_that(
+            list(self.endpoint.read(schema_cls=SimpleSchema)),
+            contains(*self.resources),
+        )
@@ -2,15 +2,26 @@
 HTTP Endpoint tests
 
 """
+from hashlib import sha1
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from json import dumps
+from socketserver import ThreadingMixIn
+from tempfile import TemporaryDirectory
+from threading import Thread
 from unittest.mock import Mock, patch
 
+from click import ClickException
 from hamcrest import (
     assert_that,
+    calling,
     equal_to,
+    has_item,
     has_length,
     is_,
+    not_,
+    raises,
 )
+from requests import Session
 
 from microcosm_resourcesync.endpoints import HTTPEndpoint
 from microcosm_resourcesync.following import FollowMode
@@ -51,6 +62,52 @@ def set_response(mock, *resources):
     ]
 
 
+class HALServer(ThreadingMixIn, HTTPServer):
+    """
+    A local stand-in for a HAL JSON service.
+
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), HALRequestHandler)
+        self.base_uri = "http://127.0.0.1:{}/api".format(self.server_port)
+        self.resources = dict()
+        self.requests = []
+        self.not_modified = 0
+
+    def add(self, path, resource):
+        self.resources["/api/{}".format(path)] = resource
+
+
+class HALRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        resource = self.server.resources.get(self.path)
+        if resource is None:
+            self.send_error(404)
+            return
+
+        body = dumps(resource).encode("utf-8")
+        etag = "\"{}\"".format(sha1(body).hexdigest())
+        if self.headers.get("If-None-Match") == etag:
+            self.server.not_modified += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
 class TestHTTPEndpoint:
 
     def setup(self):
@@ -254,3 +311,255 @@ class TestHTTPEndpoint:
         assert_that(mocked_options.call_count, is_(equal_to(1)))
         assert_that(mocked_patch.call_count, is_(equal_to(0)))
         assert_that(mocked_put.call_count, is_(equal_to(4)))
+
+    def test_write_batch_too_large(self):
+        resources = [
+            HALSchema(hal_resource("http://example.com/api/foo/1")),
+            HALSchema(hal_resource("http://example.com/api/foo/2")),
+            HALSchema(hal_resource("http://example.com/api/foo/3")),
+            HALSchema(hal_resource("http://example.com/api/foo/4")),
+        ]
+
+        def patch_response(uri, data, **kwargs):
+            # reject batches of more than two resources
+            return Mock(status_code=413 if data.count("_links") > 2 else 200)
+
+        with patch.object(self.endpoint.session, "options") as mocked_options:
+            mocked_options.return_value.headers = dict(
+                Allow=["HEAD", "POST", "OPTIONS", "GET", "PATCH"],
+            )
+            with patch.object(self.endpoint.session, "patch") as mocked_patch:
+                mocked_patch.side_effect = patch_response
+                self.endpoint.write(
+                    resources=resources,
+                    batch_size=4,
+                    formatter=Formatters.JSON,
+                    max_attempts=1,
+                    adaptive_batching=True,
+                )
+
+        assert_that(mocked_patch.call_count, is_(equal_to(3)))
+        mocked_patch.assert_any_call(
+            "http://example.com/api/foo",
+            auth=None,
+            data=Formatters.JSON.value.dump(dict(
+                items=resources[2:],
+            )),
+            headers={'Content-Type': 'application/json'}
+        )
+
+    def test_write_batch_adaptive(self):
+        resources = [
+            HALSchema(hal_resource("http://example.com/api/foo/{}".format(index)))
+            for index in range(10)
+        ]
+
+        with patch.object(self.endpoint.session, "options") as mocked_options:
+            mocked_options.return_value.headers = dict(
+                Allow=["HEAD", "POST", "OPTIONS", "GET", "PATCH"],
+            )
+            with patch.object(self.endpoint.session, "patch") as mocked_patch:
+                mocked_patch.return_value = Mock(status_code=200)
+                with patch.object(self.endpoint.session, "put") as mocked_put:
+                    self.endpoint.write(
+                        resources=resources,
+                        batch_size=1,
+                        max_batch_bytes=10000,
+                        formatter=Formatters.JSON,
+                        max_attempts=1,
+                        adaptive_batching=True,
+                    )
+
+        # adaptive batching starts batching (and growing batches) even with a batch size of one:
+        # batches of 2, 3, and 4 resources followed by the single remaining resource
+        assert_that(mocked_patch.call_count, is_(equal_to(3)))
+        assert_that(mocked_put.call_count, is_(equal_to(1)))
+        mocked_patch.assert_any_call(
+            "http://example.com/api/foo",
+            auth=None,
+            data=Formatters.JSON.value.dump(dict(
+                items=resources[0:2],
+            )),
+            headers={'Content-Type': 'application/json'}
+        )
+
+    def test_validate_for_read_stream_items(self):
+        assert_that(
+            calling(self.endpoint.validate_for_read).with_args(
+                schema_cls=HALSchema,
+                read_concurrency=2,
+                stream_items=True,
+            ),
+            raises(ClickException),
+        )
+
+    def test_validate_for_write_jsonl(self):
+        assert_that(
+            calling(self.endpoint.validate_for_write).with_args(formatter=Formatters.JSONL),
+            raises(ClickException),
+        )
+
+    def test_write_retry_after(self):
+        resource = HALSchema(hal_resource("http://example.com/api/foo/1"))
+
+        with patch.object(self.endpoint.session, "put") as mocked_put:
+            mocked_put.side_effect = [
+                Mock(status_code=429, headers={"Retry-After": "2"}),
+                Mock(status_code=503, headers=dict()),
+                Mock(status_code=200),
+            ]
+            with patch("microcosm_resourcesync.endpoints.http_endpoint.sleep") as mocked_sleep:
+                self.endpoint.write(
+                    resources=[resource],
+                    batch_size=1,
+                    formatter=Formatters.JSON,
+                    max_attempts=3,
+                    backoff=0.0,
+                )
+
+        assert_that(mocked_put.call_count, is_(equal_to(3)))
+        mocked_sleep.assert_any_call(2.0)
+        assert_that(mocked_sleep.call_count, is_(equal_to(2)))
+
+    def test_write_concurrently(self):
+        parent = HALSchema(hal_resource("http://example.com/api/foo/1"))
+        children = [
+            HALSchema(linked(
+                hal_resource("http://example.com/api/bar/{}".format(index)),
+                **{
+                    "parent:foo": dict(
+                        href=parent.uri,
+                    ),
+                }
+            ))
+            for index in range(1, 5)
+        ]
+        resources = [parent] + children
+
+        written, sessions = [], set()
+
+        def put(session, uri, **kwargs):
+            sessions.add(session)
+            written.append(uri)
+            return Mock()
+
+        # every worker writes using its own session
+        with patch.object(Session, "put", autospec=True) as mocked_put:
+            mocked_put.side_effect = put
+            self.endpoint.write(
+                resources=resources,
+                batch_size=1,
+                formatter=Formatters.JSON,
+                max_attempts=1,
+                write_concurrency=4,
+            )
+
+        assert_that(sessions, not_(has_item(self.endpoint.session)))
+        assert_that(written, has_length(5))
+        assert_that(written[0], is_(equal_to(parent.uri)))
+        assert_that(set(written[1:]), is_(equal_to({child.uri for child in children})))
+
+    def test_write_stream(self):
+        resources = (
+            HALSchema(hal_resource("http://example.com/api/foo/{}".format(index)))
+            for index in range(1, 6)
+        )
+
+        written = []
+        with patch.object(Session, "put") as mocked_put:
+            mocked_put.side_effect = lambda uri, **kwargs: written.append(uri) or Mock()
+            self.endpoint.write(
+                resources=resources,
+                batch_size=1,
+                formatter=Formatters.JSON,
+                max_attempts=1,
+                write_concurrency=2,
+            )
+
+        assert_that(written, has_length(5))
+
+
+class TestHTTPEndpointServer:
+
+    def setup(self):
+        self.server = HALServer()
+        base_uri = self.server.base_uri
+
+        def foo(index):
+            return linked(
+                hal_resource("{}/foo/{}".format(base_uri, index)),
+                **{
+                    "child:bar": dict(
+                        href="{}/bar/{}".format(base_uri, index),
+                    ),
+                }
+            )
+
+        self.server.add("foo", dict(
+            _links=dict(
+                self=dict(href="{}/foo".format(base_uri)),
+                next=dict(href="{}/foo/page/2".format(base_uri)),
+            ),
+            items=[foo(index) for index in range(0, 5)],
+        ))
+        self.server.add("foo/page/2", dict(
+            _links=dict(
+                self=dict(href="{}/foo/page/2".format(base_uri)),
+            ),
+            items=[foo(index) for index in range(5, 10)],
+        ))
+        for index in range(10):
+            self.server.add("bar/{}".format(index), linked(
+                hal_resource("{}/bar/{}".format(base_uri, index)),
+                **{
+                    "child:foo": dict(
+                        href="{}/foo/{}".format(base_uri, index),
+                    ),
+                }
+            ))
+
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.endpoint = HTTPEndpoint("{}/foo".format(base_uri))
+
+    def teardown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def read(self, **kwargs):
+        return list(self.endpoint.read(
+            schema_cls=HALSchema,
+            follow_mode=FollowMode.CHILD,
+            verbose=False,
+            limit=10,
+            **kwargs
+        ))
+
+    def test_read_concurrently(self):
+        resources = self.read(read_concurrency=4)
+
+        assert_that(resources, has_length(20))
+        # every uri is fetched exactly once (the foo resources are embedded in the pages)
+        assert_that(self.server.requests, has_length(12))
+        assert_that(set(self.server.requests), has_length(12))
+        assert_that(
+            {resource.uri for resource in resources},
+            is_(equal_to({resource.uri for resource in self.read()})),
+        )
+
+    def test_read_cached(self):
+        with TemporaryDirectory() as cache_dir:
+            resources = self.read(cache_dir=cache_dir)
+            cached_resources = self.read(cache_dir=cache_dir)
+
+        assert_that(cached_resources, is_(equal_to(resources)))
+        assert_that(self.server.not_modified, is_(equal_to(12)))
+
+    def test_read_stream_items(self):
+        resources = self.read(stream_items=True)
+
+        assert_that(resources, has_length(20))
+        assert_that(
+            {resource.uri for resource in resources},
+            is_(equal_to({resource.uri for resource in self.read()})),
+        )
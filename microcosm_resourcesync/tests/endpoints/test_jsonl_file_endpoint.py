@@ -0,0 +1,68 @@
+"""
+JSON Lines File Endpoint tests
+
+"""
+from os.path import join
+
+from click import ClickException
+from hamcrest import (
+    assert_that,
+    calling,
+    contains,
+    equal_to,
+    instance_of,
+    is_,
+    raises,
+)
+
+from microcosm_resourcesync.endpoints import JSONLinesFileEndpoint, endpoint_for
+from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.schemas import SimpleSchema
+from microcosm_resourcesync.tests.endpoints.helpers import TemporaryDirectoryTest, simple_resource
+
+
+class TestJSONLinesFileEndpoint(TemporaryDirectoryTest):
+
+    def setup(self):
+        super().setup()
+        self.endpoint = JSONLinesFileEndpoint(join(self.directory.name, "resources.jsonl"))
+        self.resources = [
+            simple_resource("foo", "{:03}".format(index))
+            for index in range(10)
+        ]
+
+    def test_endpoint_for(self):
+        assert_that(endpoint_for(self.endpoint.path), is_(equal_to(self.endpoint)))
+
+    def test_write_and_read(self):
+        self.endpoint.validate_for_write(formatter=Formatters.JSONL)
+        self.endpoint.write(self.resources, formatter=Formatters.JSONL)
+
+        with open(self.endpoint.path) as file_:
+            assert_that(file_.read().count("\n"), is_(equal_to(10)))
+        assert_that(
+            list(self.endpoint.read(schema_cls=SimpleSchema)),
+            contains(*self.resources),
+        )
+
+    def test_read_workers(self):
+        self.endpoint.write(self.resources, formatter=Formatters.JSONL)
+
+        resources = list(self.endpoint.read(schema_cls=SimpleSchema, read_workers=2))
+        assert_that(resources, contains(*self.resources))
+        assert_that(resources[0], instance_of(SimpleSchema))
+
+    def test_validate_for_write(self):
+        assert_that(
+            calling(self.endpoint.validate_for_write).with_args(formatter=Formatters.YAML),
+            raises(ClickException),
+        )
+
+    def test_write_and_read_compressed(self):
+        endpoint = endpoint_for(join(self.directory.name, "resources.jsonl.gz"))
+        endpoint.write(self.resources, formatter=Formatters.JSONL, compress_threads=2)
+
+        assert_that(
+            list(endpoint.read(schema_cls=SimpleSchema, read_workers=2)),
+            contains(*self.resources),
+        )
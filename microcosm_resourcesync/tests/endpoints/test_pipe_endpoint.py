@@ -0,0 +1,63 @@
+"""
+Pipe Endpoint tests
+
+"""
+from io import BufferedReader, BytesIO
+from json import dumps
+from unittest.mock import Mock, patch
+
+from hamcrest import (
+    assert_that,
+    contains,
+    is_,
+    none,
+    not_none,
+)
+
+from microcosm_resourcesync.endpoints import PipeEndpoint
+from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.schemas import SimpleSchema
+from microcosm_resourcesync.tests.endpoints.helpers import simple_resource
+
+
+def read(data, formatter):
+    stdin = Mock(buffer=BufferedReader(BytesIO(data.encode("utf-8"))))
+    with patch("microcosm_resourcesync.endpoints.pipe_endpoint.stdin", stdin):
+        return list(PipeEndpoint().read(schema_cls=SimpleSchema, formatter=formatter))
+
+
+class TestPipeEndpoint:
+
+    def setup(self):
+        self.resources = [
+            simple_resource("foo", "{:03}".format(index))
+            for index in range(3)
+        ]
+
+    def test_read_jsonl(self):
+        data = "\n" + "".join(Formatters.JSONL.value.dump(resource) for resource in self.resources)
+
+        # the input format does not depend on the output format
+        for formatter in Formatters:
+            resources = read(data, formatter)
+            assert_that(resources, contains(*self.resources))
+            assert_that(resources[0].raw, is_(not_none() if formatter == Formatters.JSONL else none()))
+
+    def test_read_yaml(self):
+        data = "# comment\n" + "".join(Formatters.YAML.value.dump(resource) for resource in self.resources)
+
+        for formatter in Formatters:
+            resources = read(data, formatter)
+            assert_that(resources, contains(*self.resources))
+            assert_that(resources[0].raw, is_(not_none() if formatter == Formatters.YAML else none()))
+
+    def test_read_multi_line_json(self):
+        # e.g. pretty-printed by `jq`
+        data = dumps(self.resources[0], indent=2) + "\n"
+
+        assert_that(read(data, Formatters.JSON), contains(self.resources[0]))
+
+    def test_read_yaml_flow_mapping(self):
+        data = "{id: '000', type: foo, uri: 'http://example.com/foo/000'}\n"
+
+        assert_that(read(data, Formatters.YAML), contains(self.resources[0]))
@@ -0,0 +1,87 @@
+"""
+SQLite Endpoint tests
+
+"""
+from os.path import join
+
+from hamcrest import (
+    assert_that,
+    contains,
+    equal_to,
+    has_entries,
+    has_length,
+    instance_of,
+    is_,
+)
+
+from microcosm_resourcesync.endpoints import SQLiteEndpoint, endpoint_for
+from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.incremental import content_hash
+from microcosm_resourcesync.schemas import HALSchema, LazyResource, SimpleSchema
+from microcosm_resourcesync.tests.endpoints.helpers import TemporaryDirectoryTest, simple_resource
+
+
+class TestSQLiteEndpoint(TemporaryDirectoryTest):
+
+    def setup(self):
+        super().setup()
+        self.endpoint = SQLiteEndpoint(join(self.directory.name, "resources.db"))
+        self.resources = [
+            simple_resource("bar", "000"),
+            simple_resource("foo", "000", parents=["http://example.com/bar/000"]),
+            simple_resource("foo", "001", parents=["http://example.com/bar/000"]),
+        ]
+
+    def test_endpoint_for(self):
+        assert_that(
+            endpoint_for("sqlite:///{}".format(self.endpoint.path)),
+            is_(equal_to(self.endpoint)),
+        )
+
+    def test_write_and_read(self):
+        self.endpoint.validate_for_write(formatter=Formatters.YAML)
+        self.endpoint.write(self.resources, formatter=Formatters.YAML, schema_cls=SimpleSchema)
+
+        resources = list(self.endpoint.read(schema_cls=SimpleSchema))
+        assert_that(resources, contains(*[instance_of(LazyResource)] * 3))
+        assert_that(resources, contains(*self.resources))
+        assert_that(resources[1].parents, contains("http://example.com/bar/000"))
+
+        # resources stored using a different schema are parsed
+        assert_that(
+            list(self.endpoint.read(schema_cls=HALSchema)),
+            contains(*[instance_of(HALSchema)] * 3),
+        )
+
+    def test_write_replaces(self):
+        self.endpoint.write(self.resources, formatter=Formatters.YAML, schema_cls=SimpleSchema)
+        changed = simple_resource("bar", "000")
+        changed["extra"] = "value"
+        self.endpoint.write([changed], formatter=Formatters.YAML, schema_cls=SimpleSchema)
+
+        resources = list(self.endpoint.read(schema_cls=SimpleSchema))
+        assert_that(resources, has_length(3))
+        assert_that(resources[0], is_(equal_to(changed)))
+
+    def test_read_filtered(self):
+        self.endpoint.write(self.resources, formatter=Formatters.YAML, schema_cls=SimpleSchema)
+
+        assert_that(
+            list(self.endpoint.read(schema_cls=SimpleSchema, only_types=["foo"])),
+            contains(*self.resources[1:]),
+        )
+        assert_that(
+            list(self.endpoint.read(schema_cls=SimpleSchema, uri_prefix="http://example.com/bar/")),
+            contains(self.resources[0]),
+        )
+
+    def test_content_hashes(self):
+        self.endpoint.write(self.resources, formatter=Formatters.YAML, schema_cls=SimpleSchema)
+
+        assert_that(
+            self.endpoint.content_hashes(schema_cls=SimpleSchema),
+            has_entries({
+                resource.uri: content_hash(resource)
+                for resource in self.resources
+            }),
+        )
@@ -0,0 +1,85 @@
+"""
+YAML File Endpoint tests
+
+"""
+from os.path import join
+
+from hamcrest import (
+    assert_that,
+    contains,
+    equal_to,
+    instance_of,
+    is_,
+)
+
+from microcosm_resourcesync.compression import Compression, detect_compression
+from microcosm_resourcesync.endpoints import YAMLFileEndpoint, endpoint_for
+from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.schemas import LazyResource, SimpleSchema
+from microcosm_resourcesync.tests.endpoints.helpers import TemporaryDirectoryTest, simple_resource
+
+
+class TestYAMLFileEndpoint(TemporaryDirectoryTest):
+
+    def setup(self):
+        super().setup()
+        self.endpoint = YAMLFileEndpoint(join(self.directory.name, "resources.yaml"))
+        self.resources = [
+            simple_resource("foo", "{:03}".format(index))
+            for index in range(10)
+        ]
+
+    def test_read_indexed(self):
+        self.endpoint.write(self.resources, formatter=Formatters.YAML, schema_cls=SimpleSchema)
+
+        resources = list(self.endpoint.read(schema_cls=SimpleSchema))
+        assert_that(resources, contains(*[instance_of(LazyResource)] * 10))
+        assert_that(resources, contains(*self.resources))
+
+    def test_read_stale_index(self):
+        self.endpoint.write(self.resources, formatter=Formatters.YAML, schema_cls=SimpleSchema)
+        with open(self.endpoint.path, "a") as file_:
+            file_.write(Formatters.YAML.value.dump(simple_resource("foo", "010")))
+
+        resources = list(self.endpoint.read(schema_cls=SimpleSchema))
+        assert_that(resources, contains(*[instance_of(SimpleSchema)] * 11))
+        assert_that(resources, contains(*self.resources, simple_resource("foo", "010")))
+
+    def test_write_raw(self):
+        data = "# hand-written\nid: '000'\ntype: foo\nuri: http://example.com/foo/000\n...\n"
+        with open(self.endpoint.path, "w") as file_:
+            file_.write(data)
+
+        # documents are written as they were read (when writing YAML), both from unindexed and indexed files
+        source = self.endpoint
+        for name in ("copy.yaml", "copy-of-copy.yaml"):
+            destination = YAMLFileEndpoint(join(self.directory.name, name))
+            destination.write(
+                source.read(schema_cls=SimpleSchema, formatter=Formatters.YAML),
+                formatter=Formatters.YAML,
+                schema_cls=SimpleSchema,
+            )
+            with open(destination.path) as file_:
+                assert_that(file_.read(), is_(equal_to("---\n" + data)))
+            assert_that(list(destination.read(schema_cls=SimpleSchema)), contains(simple_resource("foo", "000")))
+            source = destination
+
+    def test_read_workers(self):
+        self.endpoint.write(self.resources, formatter=Formatters.YAML)
+
+        assert_that(
+            list(self.endpoint.read(schema_cls=SimpleSchema, read_workers=2)),
+            contains(*self.resources),
+        )
+
+    def test_write_and_read_compressed(self):
+        endpoint = endpoint_for(join(self.directory.name, "resources.yaml.bz2"))
+        assert_that(endpoint, is_(equal_to(YAMLFileEndpoint(endpoint.path))))
+
+        endpoint.write(self.resources, formatter=Formatters.YAML, schema_cls=SimpleSchema)
+
+        assert_that(detect_compression(endpoint.path), is_(equal_to(Compression.BZIP2)))
+        assert_that(
+            list(endpoint.read(schema_cls=SimpleSchema, read_workers=2)),
+            contains(*self.resources),
+        )
@@ -2,9 +2,16 @@
 Test batching.
 
 """
-from hamcrest import assert_that, contains
+from hamcrest import (
+    assert_that,
+    contains,
+    equal_to,
+    is_,
+    none,
+)
 
-from microcosm_resourcesync.batching import batched
+from microcosm_resourcesync.batching import AdaptiveBatchSize, batched
+from microcosm_resourcesync.formatters import Formatters
 from microcosm_resourcesync.schemas import SimpleSchema
 
 
@@ -71,3 +78,57 @@ def test_batching_size_three():
             resources[4:],
         )
     )
+
+
+def test_batching_max_bytes():
+    size = len(Formatters.JSON.value.dump(resources[1]))
+    assert_that(
+        list(batched(resources, batch_size=3, max_batch_bytes=2 * size, formatter=Formatters.JSON)),
+        contains(
+            resources[0:1],
+            resources[1:3],
+            resources[3:4],
+            resources[4:],
+        )
+    )
+
+
+def test_batching_reuses_data():
+    batches = list(batched(resources, batch_size=3, max_batch_bytes=10000, formatter=Formatters.JSON))
+
+    for formatter in (Formatters.JSON, Formatters.JSONL):
+        for batch in batched(resources, batch_size=3, max_batch_bytes=10000, formatter=formatter):
+            assert_that(
+                formatter.value.dump_items(batch.data),
+                is_(equal_to(formatter.value.dump(dict(items=batch)))),
+            )
+    assert_that(Formatters.YAML.value.dump_items(batches[0].data), is_(none()))
+
+
+def test_batching_adaptive():
+    batch_sizer = AdaptiveBatchSize(batch_size=1, target_latency=1.0)
+    batches = batched(resources, batch_size=1, batch_sizer=batch_sizer)
+
+    assert_that(next(batches), is_(equal_to(resources[0:1])))
+    assert_that(next(batches), is_(equal_to(resources[1:2])))
+    batch_sizer.record_success(1, 0.1)
+    assert_that(batch_sizer.batch_size, is_(equal_to(2)))
+    assert_that(next(batches), is_(equal_to(resources[2:4])))
+
+
+def test_adaptive_batch_size():
+    batch_sizer = AdaptiveBatchSize(batch_size=8, target_latency=1.0, max_batch_size=12)
+
+    # batches that are not full do not grow the batch size
+    batch_sizer.record_success(4, 0.1)
+    assert_that(batch_sizer.batch_size, is_(equal_to(8)))
+
+    batch_sizer.record_success(8, 0.1)
+    assert_that(batch_sizer.batch_size, is_(equal_to(10)))
+    batch_sizer.record_success(10, 0.1)
+    assert_that(batch_sizer.batch_size, is_(equal_to(12)))
+
+    batch_sizer.record_success(12, 2.0)
+    assert_that(batch_sizer.batch_size, is_(equal_to(6)))
+    batch_sizer.record_failure(6)
+    assert_that(batch_sizer.batch_size, is_(equal_to(3)))
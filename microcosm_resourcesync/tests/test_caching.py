@@ -0,0 +1,85 @@
+"""
+Response cache tests.
+
+"""
+from os import utime
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from hamcrest import (
+    assert_that,
+    equal_to,
+    has_entries,
+    is_,
+    less_than_or_equal_to,
+    none,
+    not_,
+    not_none,
+)
+
+from microcosm_resourcesync.caching import LOW_WATER_MARK, ResponseCache
+
+
+def test_key():
+    with TemporaryDirectory() as path:
+        cache = ResponseCache(path, max_size=1024)
+        uri = "http://example.com/foo"
+
+        assert_that(cache.key(uri), is_(equal_to(cache.key(uri))))
+        assert_that(cache.key(uri, ("user", "secret")), is_(equal_to(cache.key(uri, ("user", "secret")))))
+        assert_that(cache.key(uri, ("user", "secret")), is_(not_(equal_to(cache.key(uri)))))
+        assert_that(cache.key(uri, limit=10), is_(not_(equal_to(cache.key(uri, limit=20)))))
+
+
+def test_put_and_get():
+    with TemporaryDirectory() as path:
+        cache = ResponseCache(path, max_size=1024)
+        key = cache.key("http://example.com/foo")
+        cache.put(key, {"ETag": "\"abc\""}, dict(id="foo"))
+
+        entry = cache.get(key)
+        assert_that(entry["data"], is_(equal_to(dict(id="foo"))))
+        assert_that(cache.conditional_headers(entry), has_entries({"If-None-Match": "\"abc\""}))
+
+
+def test_put_not_cacheable():
+    with TemporaryDirectory() as path:
+        cache = ResponseCache(path, max_size=1024)
+        key = cache.key("http://example.com/foo")
+        cache.put(key, dict(), dict(id="foo"))
+
+        assert_that(cache.get(key), is_(none()))
+
+
+def test_evict_least_recently_used():
+    with TemporaryDirectory() as path:
+        cache = ResponseCache(path, max_size=200)
+        keys = [cache.key("http://example.com/foo/{}".format(index)) for index in range(3)]
+
+        for index, key in enumerate(keys):
+            cache.put(key, {"ETag": "\"{}\"".format(index)}, dict(id=index))
+            # ensure distinct access times
+            utime(cache.path_for(key), ns=(index * 10 ** 9, index * 10 ** 9))
+
+        # use the oldest entry again
+        cache.get(keys[0])
+        cache.put(keys[0], {"ETag": "\"0\""}, dict(id="x" * 100))
+
+        assert_that(cache.get(keys[0]), is_(not_none()))
+        assert_that(cache.get(keys[1]), is_(none()))
+        assert_that(cache.size, is_(equal_to(sum(entry.stat().st_size for entry in cache.iter_entries()))))
+
+
+def test_evict_to_low_water_mark():
+    with TemporaryDirectory() as path:
+        cache = ResponseCache(path, max_size=1000)
+        for index in range(40):
+            key = cache.key("http://example.com/foo/{}".format(index))
+            cache.put(key, {"ETag": "\"{}\"".format(index)}, dict(id=index))
+
+        assert_that(cache.size, is_(less_than_or_equal_to(1000 * LOW_WATER_MARK)))
+
+        # the next (small) put fits without another eviction
+        with patch.object(cache, "evict") as mocked_evict:
+            cache.put(cache.key("http://example.com/bar"), {"ETag": "\"bar\""}, dict(id="bar"))
+        assert_that(mocked_evict.called, is_(equal_to(False)))
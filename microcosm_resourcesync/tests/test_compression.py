@@ -0,0 +1,60 @@
+"""
+Compression tests.
+
+"""
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from hamcrest import (
+    assert_that,
+    equal_to,
+    is_,
+    none,
+)
+
+from microcosm_resourcesync.compression import (
+    Compression,
+    decompress,
+    detect_compression,
+    open_compressed,
+    split_compression,
+)
+
+
+TEXT = "---\nid: 'fóo'\n" * 1000
+
+
+def test_split_compression():
+    assert_that(split_compression("foo.yaml.gz"), is_(equal_to(("foo.yaml", Compression.GZIP))))
+    assert_that(split_compression("foo.jsonl.xz"), is_(equal_to(("foo.jsonl", Compression.XZ))))
+    assert_that(split_compression("foo.yaml"), is_(equal_to(("foo.yaml", None))))
+
+
+def test_decompress():
+    data = TEXT.encode("utf-8")
+    for compression in Compression:
+        compressed = compression.compress(data)
+        assert_that(Compression.for_data(compressed), is_(equal_to(compression)))
+        assert_that(decompress(compressed), is_(equal_to(data)))
+    assert_that(decompress(data), is_(equal_to(data)))
+
+
+def test_open_compressed():
+    with TemporaryDirectory() as dirname:
+        for compression in Compression:
+            for threads in (1, 2):
+                # NB: the extension does not need to match; reads detect the compression
+                path = join(dirname, "{}-{}.yaml".format(compression.name, threads))
+                with open_compressed(path, "w", compression, threads) as stream:
+                    stream.write(TEXT)
+
+                assert_that(detect_compression(path), is_(equal_to(compression)))
+                with open_compressed(path, "r", threads=threads) as stream:
+                    assert_that(stream.read(), is_(equal_to(TEXT)))
+
+        path = join(dirname, "plain.yaml")
+        with open_compressed(path, "w") as stream:
+            stream.write(TEXT)
+        assert_that(detect_compression(path), is_(none()))
+        with open_compressed(path, "r") as stream:
+            assert_that(stream.read(), is_(equal_to(TEXT)))
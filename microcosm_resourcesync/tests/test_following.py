@@ -0,0 +1,104 @@
+"""
+Following tests.
+
+"""
+from hamcrest import assert_that, contains, equal_to, is_
+
+from microcosm_resourcesync.following import CrawlOrder, Frontier
+from microcosm_resourcesync.schemas.base import Link
+
+
+LINKS = [
+    Link("child:foo", "http://example.com/foo/1"),
+    Link("next", "http://example.com/bar?offset=10"),
+    Link("child:foo", "http://example.com/foo/2"),
+]
+
+MORE_LINKS = [
+    Link("child:baz", "http://example.com/baz/1"),
+    Link("next", "http://example.com/bar?offset=20"),
+]
+
+
+def crawl(crawl_order):
+    frontier = Frontier("http://example.com/bar", crawl_order)
+    frontier.seen.add(frontier.pop())
+    frontier.push(LINKS)
+    frontier.push(MORE_LINKS)
+
+    uris = []
+    while frontier:
+        uri = frontier.pop()
+        uris.append(uri)
+        frontier.seen.add(uri)
+    return uris
+
+
+def legacy_crawl():
+    """
+    The original list concatenation frontier (for comparison).
+
+    """
+    deque = ["http://example.com/bar"]
+    deque.pop()
+    for links in (LINKS, MORE_LINKS):
+        page_links = [link.uri for link in links if link.relation in ("prev", "next")]
+        other_links = [link.uri for link in links if link.relation not in ("prev", "next")]
+        deque = other_links + deque + page_links
+
+    return list(reversed(deque))
+
+
+def test_page_first():
+    assert_that(crawl(CrawlOrder.PAGE_FIRST), is_(equal_to(legacy_crawl())))
+    assert_that(
+        crawl(CrawlOrder.PAGE_FIRST),
+        contains(
+            "http://example.com/bar?offset=20",
+            "http://example.com/bar?offset=10",
+            "http://example.com/foo/2",
+            "http://example.com/foo/1",
+            "http://example.com/baz/1",
+        ),
+    )
+
+
+def test_depth_first():
+    assert_that(
+        crawl(CrawlOrder.DEPTH_FIRST),
+        contains(
+            "http://example.com/baz/1",
+            "http://example.com/bar?offset=20",
+            "http://example.com/foo/1",
+            "http://example.com/foo/2",
+            "http://example.com/bar?offset=10",
+        ),
+    )
+
+
+def test_breadth_first():
+    assert_that(
+        crawl(CrawlOrder.BREADTH_FIRST),
+        contains(
+            "http://example.com/bar?offset=10",
+            "http://example.com/foo/1",
+            "http://example.com/foo/2",
+            "http://example.com/bar?offset=20",
+            "http://example.com/baz/1",
+        ),
+    )
+
+
+def test_skip_seen():
+    frontier = Frontier("http://example.com/bar")
+    frontier.seen.add("http://example.com/bar")
+    frontier.push(LINKS)
+    frontier.seen.add("http://example.com/foo/2")
+    frontier.push(LINKS)
+
+    assert_that(len(frontier), is_(equal_to(6)))
+    assert_that(frontier.pop(), is_(equal_to("http://example.com/bar?offset=10")))
+    frontier.seen.add("http://example.com/bar?offset=10")
+    assert_that(frontier.pop(), is_(equal_to("http://example.com/foo/1")))
+    frontier.seen.add("http://example.com/foo/1")
+    assert_that(frontier.pop(), is_(equal_to(None)))
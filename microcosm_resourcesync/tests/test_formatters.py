@@ -2,9 +2,12 @@
 Formatter tests.
 
 """
-from hamcrest import assert_that, equal_to, is_
+from hamcrest import assert_that, equal_to, is_, none
 
 from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.schemas import SimpleSchema
+from microcosm_resourcesync.schemas.base import Raw
+from microcosm_resourcesync.splitting import load_documents
 
 
 EXAMPLE = dict(
@@ -27,3 +30,46 @@ def test_yaml():
         formatter.load(formatter.dump(EXAMPLE)),
         is_(equal_to(EXAMPLE)),
     )
+
+
+def test_jsonl():
+    formatter = Formatters.JSONL.value
+    assert_that(
+        formatter.dump(dict(EXAMPLE, nested=dict(text="multiple\nlines"))).count("\n"),
+        is_(equal_to(1)),
+    )
+    assert_that(
+        formatter.load(formatter.dump(EXAMPLE)),
+        is_(equal_to(EXAMPLE)),
+    )
+
+
+def test_serialize_raw():
+    data = "# unchanged\nid: c7f12ba5885f4b47bfafaa583cd5a097\nfoo: bar"
+    resource = SimpleSchema(EXAMPLE).with_raw(Raw(".yaml", data))
+
+    # raw data is passed through (as a new document) in the same format only
+    assert_that(
+        Formatters.YAML.value.serialize(resource),
+        is_(equal_to("---\n" + data + "\n")),
+    )
+    assert_that(Formatters.JSON.value.serialize(resource), is_(equal_to(Formatters.JSON.value.dump(EXAMPLE))))
+
+    # changes discard raw data
+    resource["foo"] = "baz"
+    assert_that(resource.raw, is_(none()))
+    assert_that(Formatters.YAML.value.serialize(resource), is_(equal_to(Formatters.YAML.value.dump(resource))))
+
+    # documents with directives cannot be passed through
+    resource.with_raw(Raw(".yaml", "%YAML 1.1\n---\nid: c7f12ba5885f4b47bfafaa583cd5a097\nfoo: baz\n"))
+    assert_that(Formatters.YAML.value.serialize(resource), is_(equal_to(Formatters.YAML.value.dump(resource))))
+
+
+def test_serialize_raw_leading_comment():
+    data = "# note\n\n---\nid: c7f12ba5885f4b47bfafaa583cd5a097\nfoo: bar\n"
+    resource = SimpleSchema(EXAMPLE).with_raw(Raw(".yaml", data))
+
+    # the existing document start marker is kept (rather than starting an empty document)
+    serialized = Formatters.YAML.value.serialize(resource)
+    assert_that(serialized, is_(equal_to(data)))
+    assert_that(list(load_documents(serialized + serialized)), is_(equal_to([EXAMPLE, EXAMPLE])))
@@ -0,0 +1,105 @@
+"""
+Incremental synchronization tests.
+
+"""
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from click.testing import CliRunner
+from hamcrest import (
+    assert_that,
+    contains,
+    contains_string,
+    equal_to,
+    has_entries,
+    is_,
+    not_,
+)
+
+from microcosm_resourcesync.endpoints import DirectoryEndpoint
+from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.incremental import Manifest, changed, content_hash
+from microcosm_resourcesync.main import main
+from microcosm_resourcesync.schemas import SimpleSchema
+
+
+resources = [
+    SimpleSchema(
+        id=1,
+        type="foo",
+        uri="http://example.com/foo/1",
+    ),
+    SimpleSchema(
+        id=2,
+        type="foo",
+        uri="http://example.com/foo/2",
+    ),
+]
+
+
+def test_content_hash():
+    assert_that(
+        content_hash(SimpleSchema(resources[0])),
+        is_(equal_to(content_hash(resources[0]))),
+    )
+    assert_that(
+        content_hash(SimpleSchema(resources[0], name="changed")),
+        is_(not_(equal_to(content_hash(resources[0])))),
+    )
+
+
+def test_changed():
+    previous_hashes = {
+        resources[0].uri: content_hash(resources[0]),
+        resources[1].uri: "stale",
+    }
+    current_hashes = dict()
+
+    assert_that(
+        list(changed(resources, previous_hashes, current_hashes)),
+        contains(resources[1]),
+    )
+    assert_that(current_hashes, has_entries({
+        resource.uri: content_hash(resource)
+        for resource in resources
+    }))
+
+
+def test_manifest():
+    with TemporaryDirectory() as path:
+        manifest_path = join(path, "manifest.json")
+        assert_that(Manifest.load(manifest_path).hashes, is_(equal_to(dict())))
+
+        Manifest(manifest_path, dict(foo="bar")).save()
+        assert_that(Manifest.load(manifest_path).hashes, is_(equal_to(dict(foo="bar"))))
+
+
+def test_directory_content_hashes():
+    with TemporaryDirectory() as path:
+        endpoint = DirectoryEndpoint(path)
+        endpoint.write(resources, formatter=Formatters.YAML)
+
+        assert_that(endpoint.content_hashes(schema_cls=SimpleSchema), is_(equal_to({
+            resource.uri: content_hash(resource)
+            for resource in resources
+        })))
+
+
+def test_sync_incremental():
+    with TemporaryDirectory() as path:
+        origin = join(path, "origin.yaml")
+        destination = join(path, "destination")
+        with open(origin, "w") as file_:
+            for resource in resources:
+                file_.write(Formatters.YAML.value.dump(resource))
+
+        runner = CliRunner()
+        args = ["--simple", "--incremental", origin, destination]
+
+        result = runner.invoke(main, args)
+        assert_that(result.exit_code, is_(equal_to(0)))
+        assert_that(result.output, contains_string("Skipping 0 unchanged resources"))
+
+        result = runner.invoke(main, args)
+        assert_that(result.exit_code, is_(equal_to(0)))
+        assert_that(result.output, contains_string("Skipping 2 unchanged resources"))
@@ -0,0 +1,92 @@
+"""
+JSON codec tests.
+
+"""
+from uuid import UUID
+
+from hamcrest import (
+    assert_that,
+    equal_to,
+    has_length,
+    is_,
+)
+
+from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.formatters.json_codecs import StandardJSONCodec, available_codecs
+from microcosm_resourcesync.formatters.json_formatter import JSONFormatter
+from microcosm_resourcesync.tests.benchmarking import benchmark, best_of, logger
+
+
+def hal_page(count):
+    """
+    Build a representative HAL collection page.
+
+    """
+    return dict(
+        _links=dict(
+            self=dict(href="http://example.com/api/v1/foo?offset=0&limit={}".format(count)),
+            next=dict(href="http://example.com/api/v1/foo?offset={0}&limit={0}".format(count)),
+        ),
+        count=count,
+        items=[
+            dict(
+                _links=dict(
+                    self=dict(href="http://example.com/api/v1/foo/{}".format(index)),
+                    parent=dict(href="http://example.com/api/v1/bar/{}".format(index % 10)),
+                ),
+                id=str(UUID(int=index * 0x9e3779b97f4a7c15f39cc0605cedc835 % 2 ** 128)),
+                name="Fóo {}".format(index),
+                score=index / 7,
+                tags=["alpha", "beta"],
+                enabled=index % 2 == 0,
+                createdTimestamp=1500000000.0 + index,
+                description=None,
+            )
+            for index in range(count)
+        ],
+        offset=0,
+    )
+
+
+def test_codecs_are_equivalent():
+    data = StandardJSONCodec().dumps(hal_page(100))
+
+    for codec in available_codecs():
+        assert_that(codec.loads(data), is_(equal_to(hal_page(100))))
+        assert_that(codec.dumps(hal_page(100)), is_(equal_to(data)))
+
+
+def test_codecs_accept_stdlib_extensions():
+    for codec in available_codecs():
+        assert_that(codec.loads('{"value": 100000000000000000000000}'), is_(equal_to(dict(value=10 ** 23))))
+        assert_that(codec.loads('[NaN]'), has_length(1))
+        # just beyond the signed and unsigned 64 bit ranges
+        assert_that(codec.loads('{"value": -9223372036854775809}'), is_(equal_to(dict(value=-2 ** 63 - 1))))
+        assert_that(codec.loads('[-9999999999999999999]'), is_(equal_to([-9999999999999999999])))
+        assert_that(codec.loads('{"value": 18446744073709551616}'), is_(equal_to(dict(value=2 ** 64))))
+
+
+def test_formatters_are_byte_identical():
+    page = hal_page(10)
+
+    for codec in available_codecs():
+        assert_that(
+            JSONFormatter(codec).dump(page),
+            is_(equal_to(JSONFormatter(StandardJSONCodec()).dump(page))),
+        )
+    assert_that(Formatters.JSONL.value.dump(page).splitlines(), has_length(1))
+
+
+@benchmark
+def test_codec_benchmark():
+    """
+    Compare the available codecs on representative HAL payloads.
+
+    """
+    page = hal_page(1000)
+    data = StandardJSONCodec().dumps(page)
+
+    for codec in available_codecs():
+        loads_elapsed = best_of(codec.loads, data)
+        dumps_elapsed = best_of(codec.dumps, page)
+        logger.info("codec {}: loads {:.4f}s, dumps {:.4f}s".format(codec.name, loads_elapsed, dumps_elapsed))
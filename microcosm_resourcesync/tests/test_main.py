@@ -0,0 +1,112 @@
+"""
+Command line tests.
+
+"""
+from os.path import exists, join
+from tempfile import TemporaryDirectory
+
+from click.testing import CliRunner
+from hamcrest import (
+    assert_that,
+    contains,
+    contains_string,
+    equal_to,
+    is_,
+    not_,
+)
+
+from microcosm_resourcesync.endpoints import DirectoryEndpoint, YAMLFileEndpoint
+from microcosm_resourcesync.formatters import Formatters
+from microcosm_resourcesync.main import main
+from microcosm_resourcesync.schemas import SimpleSchema
+
+
+resources = [
+    SimpleSchema(
+        id=index,
+        type="foo",
+        uri="http://example.com/foo/{}".format(index),
+    )
+    for index in range(1, 4)
+]
+
+
+def write_origin(path):
+    origin = join(path, "origin.jsonl")
+    with open(origin, "w") as file_:
+        for resource in resources:
+            file_.write(Formatters.JSONL.value.dump(resource))
+    return origin
+
+
+def test_sync_stream():
+    with TemporaryDirectory() as path:
+        origin, destination = write_origin(path), join(path, "destination")
+
+        result = CliRunner().invoke(main, ["--simple", "--stream", "--incremental", origin, destination])
+        assert_that(result.exit_code, is_(equal_to(0)))
+        assert_that(result.output, not_(contains_string("Toposorting")))
+        # streamed writes do not keep an index (entry per resource) in memory
+        assert_that(exists(join(destination, ".index.json")), is_(equal_to(False)))
+        assert_that(
+            list(DirectoryEndpoint(destination).read(schema_cls=SimpleSchema)),
+            contains(*resources),
+        )
+
+
+def test_sync_null_consumes_resources():
+    with TemporaryDirectory() as path:
+        origin = join(path, "origin.jsonl")
+        with open(origin, "w") as file_:
+            file_.write("not json\n")
+
+        for flags in ([], ["--stream"], ["--pipeline"], ["--external-sort"]):
+            result = CliRunner().invoke(main, ["--simple"] + flags + [origin, "null"])
+            assert_that(result.exit_code, is_(not_(equal_to(0))))
+
+
+def test_sync_pipeline():
+    with TemporaryDirectory() as path:
+        origin, destination = write_origin(path), join(path, "destination")
+
+        result = CliRunner().invoke(main, ["--simple", "--pipeline", origin, destination])
+        assert_that(result.exit_code, is_(equal_to(0)))
+        assert_that(
+            list(DirectoryEndpoint(destination).read(schema_cls=SimpleSchema)),
+            contains(*resources),
+        )
+
+
+def test_sync_external_sort():
+    with TemporaryDirectory() as path:
+        origin, destination = write_origin(path), join(path, "destination")
+
+        result = CliRunner().invoke(main, ["--simple", "--external-sort", "--spill-dir", path, origin, destination])
+        assert_that(result.exit_code, is_(equal_to(0)))
+        assert_that(
+            list(DirectoryEndpoint(destination).read(schema_cls=SimpleSchema)),
+            contains(*resources),
+        )
+
+
+def test_sync_compact():
+    with TemporaryDirectory() as path:
+        origin, destination = write_origin(path), join(path, "destination.yaml")
+
+        result = CliRunner().invoke(main, ["--simple", "--compact", origin, destination])
+        assert_that(result.exit_code, is_(equal_to(0)))
+        assert_that(
+            list(YAMLFileEndpoint(destination).read(schema_cls=SimpleSchema)),
+            contains(*resources),
+        )
+
+
+def test_sync_exclusive_modes():
+    with TemporaryDirectory() as path:
+        origin, destination = write_origin(path), join(path, "destination.yaml")
+
+        for flags in (["--stream", "--pipeline"], ["--pipeline", "--external-sort"], ["--compact", "--stream"]):
+            result = CliRunner().invoke(main, ["--simple"] + flags + [origin, destination])
+            assert_that(result.exit_code, is_(equal_to(2)))
+            assert_that(result.output, contains_string("may not be combined"))
+            assert_that(exists(destination), is_(equal_to(False)))
@@ -0,0 +1,61 @@
+"""
+Parallel processing tests.
+
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains,
+    equal_to,
+    has_length,
+    is_,
+    raises,
+)
+
+from microcosm_resourcesync.parallel import chunked, imap_bounded, read_ahead
+
+
+def test_chunked():
+    assert_that(
+        list(chunked(range(7), 3)),
+        contains([0, 1, 2], [3, 4, 5], [6]),
+    )
+    assert_that(list(chunked([], 3)), is_(equal_to([])))
+
+
+def test_imap_bounded():
+    consumed = []
+
+    def items():
+        for item in range(10):
+            consumed.append(item)
+            yield item
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = imap_bounded(executor, lambda item: item * item, items(), max_pending=3)
+        assert_that(next(results), is_(equal_to(0)))
+        # only a bounded number of items are consumed ahead of the results
+        assert_that(consumed, has_length(3))
+        assert_that(list(results), is_(equal_to([item * item for item in range(1, 10)])))
+
+
+def test_read_ahead():
+    assert_that(list(read_ahead(range(10), max_size=2)), is_(equal_to(list(range(10)))))
+
+    # consumers may stop early
+    results = read_ahead(range(10), max_size=2)
+    assert_that(next(results), is_(equal_to(0)))
+    results.close()
+
+
+def test_read_ahead_error():
+    def items():
+        yield 1
+        raise ValueError("failed")
+
+    assert_that(
+        calling(list).with_args(read_ahead(items(), max_size=2)),
+        raises(ValueError, "failed"),
+    )
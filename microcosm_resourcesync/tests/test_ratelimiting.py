@@ -0,0 +1,83 @@
+"""
+Rate limiting tests.
+
+"""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from hamcrest import (
+    assert_that,
+    close_to,
+    contains,
+    equal_to,
+    greater_than_or_equal_to,
+    is_,
+    less_than_or_equal_to,
+)
+
+from microcosm_resourcesync.ratelimiting import RateLimiter, backoff_delay
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+def test_rate_limiter():
+    clock = FakeClock()
+    rate_limiter = RateLimiter(rate=2.0, clock=clock, sleep=clock.sleep)
+
+    for _ in range(3):
+        with rate_limiter:
+            pass
+
+    # the first request uses the initial token; later requests wait for new tokens
+    assert_that(clock.sleeps, contains(0.5, 0.5))
+
+
+def test_rate_limiter_unlimited():
+    clock = FakeClock()
+    rate_limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+
+    for _ in range(10):
+        with rate_limiter:
+            pass
+
+    assert_that(clock.sleeps, is_(equal_to([])))
+
+
+def test_rate_limiter_adaptive():
+    rate_limiter = RateLimiter(rate=4.0, adaptive=True)
+
+    rate_limiter.record_success()
+    assert_that(rate_limiter.rate, is_(close_to(4.25, 0.001)))
+    rate_limiter.record_throttled()
+    assert_that(rate_limiter.rate, is_(close_to(2.125, 0.001)))
+
+
+def test_backoff_delay():
+    for attempt in range(5):
+        delay = backoff_delay(attempt, backoff=0.5)
+        assert_that(delay, is_(greater_than_or_equal_to(0.0)))
+        assert_that(delay, is_(less_than_or_equal_to(0.5 * 2 ** attempt)))
+
+    assert_that(backoff_delay(10, backoff=0.5, max_backoff=5.0), is_(less_than_or_equal_to(5.0)))
+
+
+def test_backoff_delay_retry_after():
+    assert_that(backoff_delay(0, retry_after="3"), is_(equal_to(3.0)))
+
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert_that(backoff_delay(0, retry_after=format_datetime(retry_at, usegmt=True)), is_(close_to(30.0, 2.0)))
+    # naive (`-0000` zone) dates are taken to be UTC
+    assert_that(backoff_delay(0, retry_after=format_datetime(retry_at.replace(tzinfo=None))), is_(close_to(30.0, 2.0)))
+    assert_that(backoff_delay(0, retry_after="Wed, 21 Oct 2015 07:28:00 -0000"), is_(equal_to(0.0)))
@@ -2,9 +2,22 @@
 Schema tests.
 
 """
-from hamcrest import assert_that, equal_to, is_
+from hamcrest import (
+    assert_that,
+    contains,
+    equal_to,
+    instance_of,
+    is_,
+)
 
+from microcosm_resourcesync.batching import batched
+from microcosm_resourcesync.following import FollowMode
+from microcosm_resourcesync.formatters import Formatters
 from microcosm_resourcesync.schemas import HALSchema, SimpleSchema
+from microcosm_resourcesync.schemas.base import Link
+from microcosm_resourcesync.schemas.compact import CompactResource, compacted
+from microcosm_resourcesync.tests.benchmarking import benchmark, best_of, logger
+from microcosm_resourcesync.toposort import toposorted
 
 
 ID = "c7f12ba5885f4b47bfafaa583cd5a097"
@@ -40,3 +53,147 @@ def test_simple_resource():
     assert_that(resource.id, is_(equal_to(ID)))
     assert_that(resource.type, is_(equal_to(TYPE)))
     assert_that(resource.uri, is_(equal_to(URI)))
+
+
+class UncachedHALSchema(HALSchema):
+    """
+    A HAL schema that recomputes its identity fields on every access.
+
+    """
+    @property
+    def parents(self):
+        return [
+            uri
+            for relation, uri in self.iter_links()
+            if relation.startswith("parent:")
+        ]
+
+    @property
+    def type(self):
+        return self.uri.split("/")[-2]
+
+    @property
+    def uri(self):
+        return self["_links"]["self"]["href"]
+
+
+def hal_resources(schema_cls, count):
+    """
+    Generate HAL resources, each of which (after the first) has an earlier parent.
+
+    """
+    def uri_for(index):
+        return "http://example.com/{}/{}".format("foo" if index % 2 else "bar", index)
+
+    return [
+        schema_cls(
+            id=index,
+            _links=dict(
+                self=dict(href=uri_for(index)),
+                **{"parent:foo": dict(href=uri_for(index // 2))} if index else {}
+            ),
+        )
+        for index in range(count)
+    ]
+
+
+def test_hal_resource_links():
+    resource = HALSchema(
+        id=ID,
+        _links=dict(
+            self=dict(href=URI),
+            next=dict(href=URI + "?offset=1"),
+            **{
+                "parent:bar": dict(href="http://example.com/bar/1"),
+                "child:baz": [dict(href="http://example.com/baz/1")],
+            }
+        ),
+    )
+    assert_that(resource.parents, contains("http://example.com/bar/1"))
+    assert_that(resource.links(FollowMode.PAGE), contains(Link("next", URI + "?offset=1")))
+    assert_that(resource.links(FollowMode.CHILD), contains(
+        Link("next", URI + "?offset=1"),
+        Link("child:baz", "http://example.com/baz/1"),
+    ))
+    assert_that(resource.links(FollowMode.NONE), is_(equal_to([])))
+
+
+def test_hal_resource_invalidation():
+    resource = HALSchema(HAL_EXAMPLE)
+    assert_that(resource.type, is_(equal_to(TYPE)))
+    assert_that(resource.parents, is_(equal_to([])))
+
+    other_uri = "http://example.com/bar/{}".format(ID)
+    resource["_links"] = dict(
+        self=dict(href=other_uri),
+        **{"parent:foo": dict(href=URI)}
+    )
+    assert_that(resource.uri, is_(equal_to(other_uri)))
+    assert_that(resource.type, is_(equal_to("bar")))
+    assert_that(resource.parents, contains(URI))
+
+    # nested changes require explicit invalidation
+    resource["_links"]["self"]["href"] = URI
+    assert_that(resource.uri, is_(equal_to(other_uri)))
+    resource.invalidate()
+    assert_that(resource.uri, is_(equal_to(URI)))
+
+    resource.update(_links=dict(self=dict(href=other_uri)))
+    assert_that(resource.uri, is_(equal_to(other_uri)))
+    assert_that(resource.parents, is_(equal_to([])))
+
+
+@benchmark
+def test_hal_resource_toposort_benchmark():
+    """
+    Compare sorting 100k HAL resources with and without cached identity fields.
+
+    """
+    uncached = hal_resources(UncachedHALSchema, 100000)
+    cached = hal_resources(HALSchema, 100000)
+
+    uncached_elapsed = best_of(toposorted, uncached)
+    elapsed = best_of(toposorted, cached)
+    logger.info("toposort hal: {:.4f}s (uncached: {:.4f}s)".format(elapsed, uncached_elapsed))
+
+    assert_that(
+        [resource.uri for resource in toposorted(cached)],
+        is_(equal_to([resource.uri for resource in toposorted(uncached)])),
+    )
+
+
+def test_compact_resource():
+    resource = HALSchema(
+        id=ID,
+        _links=dict(
+            self=dict(href=URI),
+            **{"parent:bar": dict(href="http://example.com/bar/1")}
+        ),
+    )
+    compact = CompactResource.from_resource(resource)
+
+    assert_that(compact.id, is_(equal_to(ID)))
+    assert_that(compact.type, is_(equal_to(TYPE)))
+    assert_that(compact.uri, is_(equal_to(URI)))
+    assert_that(compact.parents, contains("http://example.com/bar/1"))
+    assert_that(compact.payload, is_(instance_of(bytes)))
+    assert_that(compact.load(), is_(equal_to(resource)))
+
+    for formatter in Formatters:
+        assert_that(formatter.value.dump(compact), is_(equal_to(formatter.value.dump(resource))))
+
+
+def test_compacted():
+    resources = hal_resources(HALSchema, 100)
+    compact_resources = list(compacted(resources))
+
+    assert_that(
+        [resource.uri for resource in toposorted(compact_resources)],
+        is_(equal_to([resource.uri for resource in toposorted(resources)])),
+    )
+    assert_that(
+        [len(batch) for batch in batched(compact_resources, 10, 1000, formatter=Formatters.JSON)],
+        is_(equal_to([len(batch) for batch in batched(resources, 10, 1000, formatter=Formatters.JSON)])),
+    )
+    # lazy resources are passed through
+    assert_that(list(compacted(compact_resources)), is_(equal_to(compact_resources)))
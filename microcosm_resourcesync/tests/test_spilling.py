@@ -0,0 +1,49 @@
+"""
+External-memory toposort tests.
+
+"""
+from datetime import datetime
+from os import listdir
+from tempfile import TemporaryDirectory
+
+from hamcrest import (
+    assert_that,
+    equal_to,
+    instance_of,
+    is_,
+)
+
+from microcosm_resourcesync.schemas import SimpleSchema
+from microcosm_resourcesync.spilling import toposorted_external
+from microcosm_resourcesync.tests.test_toposort import deep_graph, shuffled, wide_graph
+from microcosm_resourcesync.toposort import toposorted
+
+
+def test_toposort_external_deep():
+    graph = shuffled(deep_graph(depth=50, width=20))
+    assert_that(list(toposorted_external(graph, SimpleSchema)), is_(equal_to(toposorted(graph))))
+
+
+def test_toposort_external_wide():
+    graph = shuffled(wide_graph(width=50, fanout=20))
+    assert_that(list(toposorted_external(graph, SimpleSchema)), is_(equal_to(toposorted(graph))))
+
+
+def test_toposort_external_content():
+    resource = SimpleSchema(
+        id=1,
+        type="foo",
+        uri="http://example.com/foo/1",
+        # YAML payloads may contain values that JSON cannot encode
+        createdAt=datetime(2017, 1, 1),
+    )
+
+    with TemporaryDirectory() as spill_dir:
+        results = toposorted_external([resource], SimpleSchema, spill_dir)
+        result = next(results)
+        assert_that(result, is_(equal_to(resource)))
+        assert_that(result, instance_of(SimpleSchema))
+
+        # the spill file is temporary
+        results.close()
+        assert_that(listdir(spill_dir), is_(equal_to([])))
@@ -0,0 +1,102 @@
+"""
+Splitting tests
+
+"""
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from hamcrest import (
+    assert_that,
+    contains,
+    equal_to,
+    has_length,
+    is_,
+    none,
+)
+from yaml import safe_load_all
+
+from microcosm_resourcesync.splitting import (
+    find_boundary,
+    find_line_boundary,
+    iter_ranges,
+    load_range,
+    load_raw_documents,
+    split_documents,
+    split_ranges,
+)
+
+
+DOCUMENTS = b"""\
+id: first
+---
+id: second
+description: |
+    --- not a boundary
+---not-a-boundary: true
+--- {id: third}
+---
+...
+---
+id: fifth
+"""
+
+
+def test_find_boundary():
+    assert_that(find_boundary(DOCUMENTS, 0), is_(equal_to(10)))
+    assert_that(find_boundary(DOCUMENTS, 11), is_(equal_to(DOCUMENTS.index(b"--- {"))))
+    assert_that(find_boundary(DOCUMENTS, len(DOCUMENTS) - 5), is_(equal_to(-1)))
+
+
+def test_find_line_boundary():
+    assert_that(find_line_boundary(b"a\nbc\nd", 0), is_(equal_to(0)))
+    assert_that(find_line_boundary(b"a\nbc\nd", 2), is_(equal_to(2)))
+    assert_that(find_line_boundary(b"a\nbc\nd", 3), is_(equal_to(5)))
+    assert_that(find_line_boundary(b"a\nbc\nd", 6), is_(equal_to(-1)))
+
+
+def test_split_ranges():
+    ranges = list(split_ranges(DOCUMENTS, chunk_size=1))
+
+    # every chunk is a whole number of documents
+    assert_that(ranges, has_length(5))
+    assert_that(
+        [document for start, end in ranges for document in safe_load_all(DOCUMENTS[start:end])],
+        is_(equal_to(list(safe_load_all(DOCUMENTS)))),
+    )
+
+
+def test_iter_ranges():
+    with TemporaryDirectory() as dirname:
+        path = join(dirname, "documents.yaml")
+
+        with open(path, "wb") as file_:
+            file_.write(DOCUMENTS)
+        assert_that(
+            [document for byte_range in iter_ranges(path, chunk_size=1) for document in load_range(path, byte_range)],
+            contains(*safe_load_all(DOCUMENTS)),
+        )
+
+        with open(path, "wb") as file_:
+            file_.write(b"%YAML 1.1\n" + DOCUMENTS)
+        assert_that(iter_ranges(path), is_(none()))
+
+        with open(path, "wb"):
+            pass
+        assert_that(iter_ranges(path), is_(equal_to([])))
+
+
+def test_split_documents():
+    lines = DOCUMENTS.decode("utf-8").splitlines(keepends=True)
+    texts = list(split_documents(lines))
+
+    assert_that("".join(texts), is_(equal_to(DOCUMENTS.decode("utf-8"))))
+    assert_that(
+        [document for document, text in load_raw_documents(lines)],
+        is_(equal_to([document for document in safe_load_all(DOCUMENTS) if document is not None])),
+    )
+
+    # directives stay with the following document
+    assert_that(
+        list(split_documents(["id: first\n", "%YAML 1.1\n", "---\n", "id: second\n"])),
+        contains("id: first\n", "%YAML 1.1\n---\nid: second\n"),
+    )
@@ -0,0 +1,73 @@
+"""
+Streaming tests.
+
+"""
+from json import dumps
+
+from hamcrest import (
+    assert_that,
+    calling,
+    equal_to,
+    is_,
+    raises,
+)
+
+from microcosm_resourcesync.streaming import iter_json_items
+
+
+EXAMPLE = dict(
+    _links=dict(
+        self=dict(href="http://example.com/api/foo"),
+        next=dict(href="http://example.com/api/foo?offset=2"),
+    ),
+    count=123456789,
+    items=[
+        dict(id=1, name="café ☃", score=-12.5e3, tags=["a", "b"]),
+        dict(id=2, name="", flags=[True, False, None], nested=dict(items=[1, 2, 3])),
+        dict(id=3),
+    ],
+    offset=0.25,
+)
+
+
+def chunked(data, size):
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+def parse(data, size, key="items"):
+    envelope = dict()
+    items = list(iter_json_items(chunked(data, size), envelope, key))
+    return items, envelope
+
+
+def test_iter_json_items():
+    data = dumps(EXAMPLE, indent=2).encode("utf-8")
+    expected_envelope = {key: value for key, value in EXAMPLE.items() if key != "items"}
+
+    for size in (1, 2, 3, 7, 64, len(data)):
+        items, envelope = parse(data, size)
+        assert_that(items, is_(equal_to(EXAMPLE["items"])))
+        assert_that(envelope, is_(equal_to(expected_envelope)))
+
+
+def test_iter_json_items_trailing_number():
+    items, envelope = parse(b'{"items": [], "count": 1234567}', 3)
+    assert_that(items, is_(equal_to([])))
+    assert_that(envelope, is_(equal_to(dict(count=1234567))))
+
+
+def test_iter_json_items_not_an_array():
+    items, envelope = parse(b'{"items": {"id": 1}}', 4)
+    assert_that(items, is_(equal_to([])))
+    assert_that(envelope, is_(equal_to(dict(items=dict(id=1)))))
+
+
+def test_iter_json_items_empty():
+    assert_that(parse(b" {} ", 1), is_(equal_to(([], dict()))))
+
+
+def test_iter_json_items_truncated():
+    assert_that(
+        calling(parse).with_args(b'{"items": [{"id": 1}, {"id"', 4),
+        raises(ValueError),
+    )
@@ -2,12 +2,27 @@
 Toposort test.
 
 """
+from collections import defaultdict
 from random import shuffle
 
-from hamcrest import assert_that, contains
+from hamcrest import (
+    assert_that,
+    calling,
+    contains,
+    equal_to,
+    has_length,
+    is_,
+    raises,
+)
 
 from microcosm_resourcesync.schemas import SimpleSchema
-from microcosm_resourcesync.toposort import toposorted
+from microcosm_resourcesync.tests.benchmarking import benchmark, best_of, logger
+from microcosm_resourcesync.toposort import (
+    IncrementalToposorter,
+    toposorted,
+    toposorted_levels,
+    toposorted_online,
+)
 
 
 resources = [
@@ -90,3 +105,187 @@ def test_toposort():
             resources[6],
         ),
     )
+
+
+def legacy_toposorted(resources):
+    """
+    The original, rescanning implementation of `toposorted` (for comparison).
+
+    """
+    resources = sorted(
+        resources,
+        key=lambda resource: (resource.type, resource.id),
+    )
+    nodes = {
+        resource.uri
+        for resource in resources
+    }
+
+    incoming = defaultdict(set)
+    outgoing = defaultdict(set)
+    for resource in resources:
+        for parent in resource.parents:
+            if parent not in nodes:
+                continue
+            incoming[resource.uri].add(parent)
+            outgoing[parent].add(resource.uri)
+
+    results = []
+    while resources:
+        remaining = []
+        for resource in resources:
+            if incoming[resource.uri]:
+                remaining.append(resource)
+                continue
+
+            results.append(resource)
+            for child in outgoing[resource.uri]:
+                incoming[child].remove(resource.uri)
+
+        if len(resources) == len(remaining):
+            raise Exception("Cycle detected")
+        resources = remaining
+
+    return results
+
+
+def deep_graph(depth, width=1):
+    """
+    Generate `width` parent chains of length `depth` that cycle through a few types.
+
+    """
+    types = ["tenant", "org", "project", "task", "comment"]
+    results = []
+    for chain in range(width):
+        parent = None
+        for level in range(depth):
+            type_ = types[(level * 7 + chain) % len(types)]
+            id_ = depth * chain + level
+            uri = "http://example.com/{}/{}".format(type_, id_)
+            results.append(SimpleSchema(
+                id=id_,
+                type=type_,
+                uri=uri,
+                parents=[parent, "http://example.com/external/1"] if parent else [],
+            ))
+            parent = uri
+    return results
+
+
+def wide_graph(width, fanout):
+    """
+    Generate a shallow tree where every parent has `fanout` children.
+
+    """
+    results = []
+    for index in range(width):
+        parent_uri = "http://example.com/parent/{}".format(index)
+        results.append(SimpleSchema(id=index, type="parent", uri=parent_uri))
+        for offset in range(fanout):
+            id_ = index * fanout + offset
+            results.append(SimpleSchema(
+                id=id_,
+                type="child",
+                uri="http://example.com/child/{}".format(id_),
+                parents=[parent_uri],
+            ))
+    return results
+
+
+def test_toposort_cycle():
+    cyclic = [
+        SimpleSchema(id=1, type="foo", uri="http://example.com/foo/1", parents=["http://example.com/foo/2"]),
+        SimpleSchema(id=2, type="foo", uri="http://example.com/foo/2", parents=["http://example.com/foo/1"]),
+    ]
+    assert_that(
+        calling(toposorted).with_args(cyclic),
+        raises(Exception, "Cycle detected"),
+    )
+
+
+def test_toposort_matches_legacy_deep():
+    graph = shuffled(deep_graph(depth=50, width=20))
+    assert_that(toposorted(graph), is_(equal_to(legacy_toposorted(graph))))
+
+
+def test_toposort_matches_legacy_wide():
+    graph = shuffled(wide_graph(width=50, fanout=20))
+    assert_that(toposorted(graph), is_(equal_to(legacy_toposorted(graph))))
+
+
+@benchmark
+def test_toposort_benchmark():
+    """
+    Compare against the legacy implementation on deep and wide graphs.
+
+    """
+    for name, graph in (
+        ("deep", shuffled(deep_graph(depth=2000))),
+        ("wide", shuffled(wide_graph(width=100, fanout=100))),
+    ):
+        legacy_elapsed = best_of(legacy_toposorted, graph)
+        elapsed = best_of(toposorted, graph)
+        logger.info("toposort {}: {:.4f}s (legacy: {:.4f}s)".format(name, elapsed, legacy_elapsed))
+
+
+def test_toposort_levels():
+    assert_that(
+        toposorted_levels(shuffled(resources)),
+        contains(
+            contains(resources[0]),
+            contains(resources[1], resources[4]),
+            contains(resources[2], resources[3], resources[5], resources[6]),
+        ),
+    )
+
+
+def test_toposort_levels_independent():
+    graph = shuffled(deep_graph(depth=20, width=10))
+    for wave in toposorted_levels(graph):
+        uris = {resource.uri for resource in wave}
+        assert_that(wave, has_length(10))
+        for resource in wave:
+            assert_that(uris.isdisjoint(resource.parents), is_(equal_to(True)))
+
+
+def assert_topological(results):
+    released = set()
+    uris = {resource.uri for resource in results}
+    for resource in results:
+        assert_that(uris.intersection(resource.parents).issubset(released), is_(equal_to(True)))
+        released.add(resource.uri)
+
+
+def test_toposort_online():
+    graph = shuffled(deep_graph(depth=20, width=10))
+    results = list(toposorted_online(graph))
+
+    assert_that(results, has_length(len(graph)))
+    assert_topological(results)
+
+
+def test_incremental_toposorter():
+    sorter = IncrementalToposorter()
+
+    # children are held until their parents arrive
+    assert_that(sorter.add(resources[2]), is_(equal_to([])))
+    assert_that(sorter.add(resources[1]), is_(equal_to([])))
+    assert_that(sorter, has_length(2))
+    assert_that(sorter.add(resources[0]), contains(resources[0], resources[1], resources[2]))
+    assert_that(sorter, has_length(0))
+
+    # parents outside of the graph are only known at the end of the input
+    orphan = SimpleSchema(id=8, type="orphan", uri="http://example.com/orphan/8", parents=["http://example.com/x"])
+    assert_that(sorter.add(orphan), is_(equal_to([])))
+    assert_that(sorter.flush(), contains(orphan))
+
+
+def test_toposort_online_cycle():
+    cyclic = [
+        SimpleSchema(id=1, type="foo", uri="http://example.com/foo/1", parents=["http://example.com/foo/2"]),
+        SimpleSchema(id=2, type="foo", uri="http://example.com/foo/2", parents=["http://example.com/foo/1"]),
+    ]
+    assert_that(
+        calling(list).with_args(toposorted_online(cyclic)),
+        raises(Exception, "Cycle detected"),
+    )
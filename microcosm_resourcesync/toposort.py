@@ -3,6 +3,7 @@ Topological sort.
 
 """
 from collections import defaultdict
+from heapq import heappop, heappush
 
 
 def toposorted(resources):
@@ -16,44 +17,176 @@ def toposorted(resources):
     The topological sort uses Kahn's algorithm, which is a stable sort and will preserve this
     ordering; note that a DFS will produce a worst case ordering from the perspective of batching.
 
+    Nodes are emitted in "passes" over the sorted resources: a node belongs to the same pass as its
+    latest parent if it sorts after that parent and to the following pass otherwise. Ordering a
+    priority queue by `(pass, position)` reproduces a pass-by-pass scan in O(V log V + E) time
+    instead of rescanning every remaining resource once per level of the graph.
+
     """
-    # sort resources first so we have a deterministic order of nodes with the same partial order
-    resources = sorted(
-        resources,
-        key=lambda resource: (resource.type, resource.id),
-    )
+    resources, children, indegree = build_graph(resources)
 
-    # build incoming and outgoing edges
-    nodes = {
-        resource.uri
-        for resource in resources
-    }
+    passes = [0] * len(resources)
+    queue = [
+        (0, index)
+        for index, count in enumerate(indegree)
+        if not count
+    ]
 
-    incoming = defaultdict(set)
-    outgoing = defaultdict(set)
-    for resource in resources:
-        for parent in resource.parents:
-            if parent not in nodes:
-                # ignore references that lead outside of the current graph
-                continue
-            incoming[resource.uri].add(parent)
-            outgoing[parent].add(resource.uri)
+    results = []
+    while queue:
+        pass_, index = heappop(queue)
+        results.append(resources[index])
+
+        for child in children[index]:
+            # a child sorting before its parent must wait for the next pass
+            passes[child] = max(passes[child], pass_ if index < child else pass_ + 1)
+            indegree[child] -= 1
+            if not indegree[child]:
+                heappush(queue, (passes[child], child))
+
+    if len(results) != len(resources):
+        raise Exception("Cycle detected")
+
+    return results
+
+
+def toposorted_levels(resources):
+    """
+    Perform a topological sort on the input resources, grouping them into dependency "waves".
+
+    Every resource is placed in the wave after its deepest (in-graph) parent, so no resource depends
+    on another resource in the same wave and all resources in a wave may be written concurrently.
 
+    Within each wave, resources preserve the deterministic `(type, id)` ordering.
+
+    """
+    resources, children, indegree = build_graph(resources)
+
+    wave = [
+        index
+        for index, count in enumerate(indegree)
+        if not count
+    ]
+
+    emitted = 0
     results = []
-    while resources:
-        remaining = []
-        for resource in resources:
-            if incoming[resource.uri]:
-                # node still has incoming edges
-                remaining.append(resource)
-                continue
+    while wave:
+        results.append([resources[index] for index in wave])
+        emitted += len(wave)
 
-            results.append(resource)
-            for child in outgoing[resource.uri]:
-                incoming[child].remove(resource.uri)
+        next_wave = []
+        for index in wave:
+            for child in children[index]:
+                indegree[child] -= 1
+                if not indegree[child]:
+                    next_wave.append(child)
+        wave = sorted(next_wave)
 
-        if len(resources) == len(remaining):
-            raise Exception("Cycle detected")
-        resources = remaining
+    if emitted != len(resources):
+        raise Exception("Cycle detected")
 
     return results
+
+
+class IncrementalToposorter:
+    """
+    Perform a topological sort on resources that arrive one at a time.
+
+    Each resource is released as soon as all of its parents have been released; resources whose parents
+    have not (yet) been seen are held. Parents that never arrive lead outside of the graph, so held
+    resources are released (in `toposorted` order) once the input ends.
+
+    """
+    def __init__(self):
+        self.released = set()
+        self.held = dict()
+        self.waiting = defaultdict(list)
+
+    def __len__(self):
+        return len(self.held)
+
+    def add(self, resource):
+        """
+        Add a resource, returning the resources released by its arrival.
+
+        """
+        missing = set(resource.parents) - self.released
+        missing.discard(resource.uri)
+        if missing:
+            self.held[id(resource)] = [resource, len(missing)]
+            for parent in missing:
+                self.waiting[parent].append(id(resource))
+            return []
+
+        results = []
+        stack = [resource]
+        while stack:
+            resource = stack.pop()
+            results.append(resource)
+            self.released.add(resource.uri)
+
+            for key in self.waiting.pop(resource.uri, ()):
+                held = self.held.get(key)
+                if held is None:
+                    continue
+                held[1] -= 1
+                if not held[1]:
+                    del self.held[key]
+                    stack.append(held[0])
+        return results
+
+    def flush(self):
+        """
+        Release all held resources (at the end of the input).
+
+        """
+        held = [resource for resource, _ in self.held.values()]
+        self.held.clear()
+        self.waiting.clear()
+        return toposorted(held)
+
+
+def toposorted_online(resources):
+    """
+    Generate resources in a topological order as they arrive.
+
+    Unlike `toposorted`, the order depends on the input order; in exchange, resources may be written
+    before all resources have been read.
+
+    """
+    sorter = IncrementalToposorter()
+    for resource in resources:
+        yield from sorter.add(resource)
+    yield from sorter.flush()
+
+
+def build_graph(resources):
+    """
+    Build the dependency graph for the input resources.
+
+    Returns the resources in `(type, id)` order together with adjacency lists of child positions and
+    the number of (in-graph) parents for each position. Using integer positions keeps the edge sets
+    compact and avoids hashing URIs more than once.
+
+    """
+    # sort resources first so we have a deterministic order of nodes with the same partial order
+    resources = sorted(
+        resources,
+        key=lambda resource: (resource.type, resource.id),
+    )
+
+    # NB: more than one resource may share a URI; children depend on all of them
+    positions = defaultdict(list)
+    for index, resource in enumerate(resources):
+        positions[resource.uri].append(index)
+
+    children = [[] for _ in resources]
+    indegree = [0] * len(resources)
+    for index, resource in enumerate(resources):
+        for parent in set(resource.parents):
+            # ignore references that lead outside of the current graph
+            for parent_index in positions.get(parent, ()):
+                children[parent_index].append(index)
+                indegree[index] += 1
+
+    return resources, children, indegree
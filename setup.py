@@ -22,6 +22,11 @@ setup(
         "PyYAML>=3.12",
         "requests>=2.18.4",
     ],
+    extras_require={
+        "orjson": [
+            "orjson>=3.0",
+        ],
+    },
     setup_requires=[
         "nose>=1.3.7",
     ],